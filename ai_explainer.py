@@ -1,7 +1,7 @@
 import os
-import json
 import time
 import requests
+import orjson
 import streamlit as st
 
 class AIExplorer:
@@ -117,7 +117,7 @@ class AIExplorer:
             if json_str.endswith('```'):
                 json_str = json_str[:-3]
                 
-            return json.loads(json_str)
+            return orjson.loads(json_str)
         
         except Exception as e:
             st.error(f"Error with Google AI: {e}")
@@ -204,7 +204,7 @@ class AIExplorer:
             if json_str.endswith('```'):
                 json_str = json_str[:-3]
                 
-            return json.loads(json_str)
+            return orjson.loads(json_str)
         
         except Exception as e:
             st.error(f"Error with GROQ AI: {e}")
@@ -348,7 +348,7 @@ class AIExplorer:
                 if json_str.endswith('```'):
                     json_str = json_str[:-3]
                     
-                return json.loads(json_str)
+                return orjson.loads(json_str)
             
             elif self.provider == "groq":
                 url = "https://api.groq.com/openai/v1/chat/completions"
@@ -399,7 +399,7 @@ class AIExplorer:
                 if json_str.endswith('```'):
                     json_str = json_str[:-3]
                     
-                return json.loads(json_str)
+                return orjson.loads(json_str)
                 
         except Exception as e:
             st.error(f"Error exploring subtopic: {e}")
@@ -35,8 +35,9 @@ def is_valid_email(email):
     email_domains = ["gmail", "hotmail", "yahoo", "outlook"]
     email_tlds = [".com", ".in", ".org", ".edu", ".co.in"]
     
-    domain_valid = any(domain in email.lower() for domain in email_domains)
-    tld_valid = any(tld in email.lower() for tld in email_tlds)
+    email_lower = email.lower()
+    domain_valid = any(domain in email_lower for domain in email_domains)
+    tld_valid = any(tld in email_lower for tld in email_tlds)
     
     return domain_valid and tld_valid
 
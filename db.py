@@ -1,25 +1,47 @@
 import os
 import datetime
+import logging
+import re
+import threading
+from collections import defaultdict
+from collections.abc import Hashable
 from typing import Dict, Any, List, Optional
 from bson.objectid import ObjectId
-from pymongo import MongoClient, TEXT, DESCENDING
+from pymongo import MongoClient, UpdateOne, TEXT, DESCENDING
 from pymongo.collection import Collection
-from bson.binary import Binary
-from gridfs import GridFS
-import streamlit as st
+from pymongo.errors import BulkWriteError
 
 
+logger = logging.getLogger(__name__)
+
 # MongoDB Connection Singleton
 _db_connection = None
+_db_connection_lock = threading.Lock()
+
+def _err(msg):
+    """Report an error through Streamlit, importing it only when needed"""
+    import streamlit as st
+    st.error(msg)
+
+def field_path_safe(keys):
+    """Whether every key can be used as one component of a dotted update path"""
+    return not any("." in key or key.startswith("$") for key in keys)
+
+def _graph_data_set(new_nodes, new_edges):
+    """$set fields adding nodes and edges under graph_data"""
+    update = {f"graph_data.nodes.{key}": attrs for key, attrs in new_nodes.items()}
+    update.update({f"graph_data.edges.{key}": edge for key, edge in new_edges.items()})
+    return update
 
 class MongoDBConnection:
     def __init__(self):
         """Initialize MongoDB connection using environment variables"""
+        import streamlit as st
         self.mongo_uri = st.secrets["MONGO_URI"]
         self.db_name = st.secrets["DB_NAME"] 
         self.client: Optional[MongoClient] = None
         self.db: Optional[Any] = None
-        self.fs: Optional[GridFS] = None
+        self._fs: Optional[Any] = None
 
         # Collections
         self.users: Optional[Collection] = None
@@ -31,7 +53,6 @@ class MongoDBConnection:
         try:
             self.client = MongoClient(self.mongo_uri)
             self.db = self.client[self.db_name]
-            self.fs = GridFS(self.db)
 
             # Initialize collections
             self.users = self.db.users
@@ -42,19 +63,70 @@ class MongoDBConnection:
             self.users.create_index("email", unique=True)
             self.knowledge_trees.create_index([("user_id", 1), ("topic", 1)])
             self.learning_sessions.create_index("user_id")
-            self.learning_sessions.create_index([("nodes", TEXT)])
+            self.learning_sessions.create_index([("user_id", 1), ("topic", 1)])
+            # A collection holds a single text index; replace the old one on the unused "nodes" field
+            if "nodes_text" in self.learning_sessions.index_information():
+                self.learning_sessions.drop_index("nodes_text")
+            self.learning_sessions.create_index([("nodes_explored", TEXT), ("topic", TEXT)])
             self.learning_sessions.create_index([("created_at", DESCENDING)])
+            self.learning_sessions.create_index([("user_id", 1), ("session_date", 1)])
+            self.learning_sessions.create_index([("user_id", 1), ("timestamp", DESCENDING)])
+
+            # One-off data backfills; a single lookup of the stored version when they are done
+            self._migrate()
 
             return True
         except Exception as e:
-            st.error(f"Failed to connect to MongoDB: {e}")
+            _err(f"Failed to connect to MongoDB: {e}")
             return False
     
-    def get_all_sessions(self):
+    def _migrate(self):
+        """Run the data backfills this database hasn't had yet, recording the version reached"""
+        meta = self.db.meta
+        done = (meta.find_one({"_id": "schema"}) or {}).get("version", 0)
+        for version, migration in enumerate(_MIGRATIONS[done:], start=done + 1):
+            migration(self)
+            meta.update_one({"_id": "schema"}, {"$set": {"version": version}}, upsert=True)
+
+    def _backfill_node_count(self):
+        """Set the denormalized node_count on sessions written before it existed"""
+        self.learning_sessions.update_many(
+            {"node_count": {"$exists": False}},
+            [{"$set": {"node_count": {"$size": {"$ifNull": ["$nodes_explored", []]}}}}]
+        )
+
+    def _backfill_session_date(self):
+        """Derive session_date from the UTC timestamp where it is missing or was written as a local-time date"""
+        utc_date = {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}
+        self.learning_sessions.update_many(
+            {"timestamp": {"$type": "date"}, "$expr": {"$ne": ["$session_date", utc_date]}},
+            [{"$set": {"session_date": utc_date}}]
+        )
+
+    @property
+    def fs(self):
+        """GridFS handle, created on first use since only graph images need it"""
+        if self._fs is None:
+            from gridfs import GridFS
+            self._fs = GridFS(self.db)
+        return self._fs
+
+    def get_all_sessions(self, limit=500, projection=None):
+        """
+        Retrieve the most recent learning sessions across all users.
+        
+        Parameters:
+        - limit (int): Maximum number of sessions to return; unbounded scans are not allowed
+        - projection (dict, optional): Fields to fetch, so callers only pull what they render
+        
+        Returns:
+        - list: Session documents, newest first
+        """
         try:
-            return list(self.learning_sessions.find())
+            cursor = self.learning_sessions.find({}, projection).sort("timestamp", -1)
+            return list(cursor.limit(limit).batch_size(200))
         except Exception as e:
-            st.error(f"Error fetching sessions: {e}")
+            _err(f"Error fetching sessions: {e}")
             return []
 
     def close(self):
@@ -76,7 +148,7 @@ class MongoDBConnection:
             tree_doc = {
                 "user_id": user_id,
                 "topic": topic,
-                "created_at": datetime.datetime.utcnow(),
+                "created_at": self.get_timestamp(),
                 "graph_data": {
                     "nodes": nodes_dict,
                     "edges": edges_dict
@@ -96,16 +168,101 @@ class MongoDBConnection:
                 return result.inserted_id
 
         except Exception as e:
-            st.error(f"Error saving knowledge tree: {e}")
+            _err(f"Error saving knowledge tree: {e}")
             return None
 
-    def get_knowledge_tree(self, user_id, topic=None):
+    def add_to_knowledge_tree(self, tree_id, new_nodes, new_edges):
+        """
+        Add nodes and edges to a stored knowledge tree without rewriting the rest of it.
+        
+        Parameters:
+        - tree_id (str): The unique identifier of the knowledge tree to extend
+        - new_nodes (dict): Node name -> attributes for the nodes added since the last save
+        - new_edges (dict): Edge key -> edge document for the edges added since the last save
+        
+        Returns:
+        - bool: True if the tree was updated; False if it was not found or a key cannot be a field path
+        """
+        # Keys become dotted field paths, so names containing "." or starting with "$" need a full save
+        if not field_path_safe(new_nodes):
+            return False
+        try:
+            update = _graph_data_set(new_nodes, new_edges)
+            if not update:
+                return True
+            result = self.knowledge_trees.update_one({"_id": ObjectId(tree_id)}, {"$set": update})
+            return result.matched_count > 0
+        except Exception as e:
+            _err(f"Error updating knowledge tree: {e}")
+            return False
+
+    def replace_knowledge_tree_graph(self, tree_id, nodes_dict, edges_dict):
+        """
+        Rewrite the nodes and edges of one stored knowledge tree, addressed by its id.
+        
+        Parameters:
+        - tree_id (str): The unique identifier of the knowledge tree to rewrite
+        - nodes_dict (dict): Every node of the tree
+        - edges_dict (dict): Every edge of the tree
+        
+        Returns:
+        - bool: True if the tree was found and updated
+        """
+        try:
+            result = self.knowledge_trees.update_one(
+                {"_id": ObjectId(tree_id)},
+                {"$set": {"graph_data": {"nodes": nodes_dict, "edges": edges_dict}}}
+            )
+            return result.matched_count > 0
+        except Exception as e:
+            _err(f"Error updating knowledge tree: {e}")
+            return False
+
+    def add_to_knowledge_trees(self, additions):
+        """
+        Add nodes and edges to several stored knowledge trees in one round trip.
+        
+        Parameters:
+        - additions (dict): Tree id -> (new_nodes, new_edges), with node names usable as field paths
+        
+        Returns:
+        - set: Ids of the trees whose additions were not written; empty when the whole batch was
+        """
+        # Called from the background tree writer, which has no page to show st.error on
+        failed = set()
+        tree_ids, operations = [], []
+        for tree_id, (new_nodes, new_edges) in additions.items():
+            if not (new_nodes or new_edges):
+                continue
+            if not ObjectId.is_valid(tree_id):
+                logger.error("Not a knowledge tree id: %r", tree_id)
+                failed.add(tree_id)
+                continue
+            tree_ids.append(tree_id)
+            operations.append(UpdateOne({"_id": ObjectId(tree_id)}, {"$set": _graph_data_set(new_nodes, new_edges)}))
+        if not operations:
+            return failed
+        try:
+            self.knowledge_trees.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Unordered, so only the operations listed in writeErrors failed
+            for error in e.details.get("writeErrors", []):
+                logger.error("Error updating knowledge tree %s: %s", tree_ids[error["index"]], error.get("errmsg"))
+                failed.add(tree_ids[error["index"]])
+        except Exception as e:
+            logger.error("Error updating knowledge trees: %s", e)
+            failed.update(tree_ids)
+        return failed
+
+    def get_knowledge_tree(self, user_id, topic=None, projection=None, limit=0):
         """
         Retrieve knowledge trees for a user from the database.
         
         Parameters:
         - user_id (str): The ID of the user whose knowledge trees to retrieve
         - topic (str, optional): If provided, filters results to trees with this specific topic
+        - projection (dict, optional): Fields to return, e.g. {"topic": 1} to skip the graph data
+        - limit (int, optional): Maximum number of trees to return; 0 returns all of them
         
         Returns:
         - list: A list of knowledge tree documents, each containing topic, nodes, edges, and metadata
@@ -123,7 +280,7 @@ class MongoDBConnection:
                 
             # Execute query and return results as a list
             # Sort by last_modified date to show most recent first
-            cursor = collection.find(query).sort("last_modified", -1)
+            cursor = collection.find(query, projection).sort("last_modified", -1).limit(limit)
             return list(cursor)
         except Exception as e:
             print(f"Error retrieving knowledge tree: {e}")
@@ -175,6 +332,7 @@ class MongoDBConnection:
             collection = self.db.learning_sessions
             
             # Create session document
+            now = self.get_timestamp()
             session_doc = {
                 "user_id": user_id,
                 "topic": topic,
@@ -182,8 +340,8 @@ class MongoDBConnection:
                 "nodes_explored": nodes_explored,
                 "node_count": len(nodes_explored),
                 "time_spent": time_spent,
-                "timestamp": datetime.datetime.now(),
-                "session_date": datetime.datetime.now().strftime("%Y-%m-%d")
+                "timestamp": now,
+                "session_date": now.date().isoformat()
             }
             
             # Insert session document
@@ -210,19 +368,40 @@ class MongoDBConnection:
             # Connect to users collection
             collection = self.db.users
             
-            # Update user document with incremented stats
+            now = self.get_timestamp()
+            today = now.date()
+            yesterday = (today - datetime.timedelta(days=1)).isoformat()
+            
+            # Update user document with incremented stats. The streak is kept on the
+            # user so reads need no session scan; within a single $set stage the
+            # expressions see the previous last_active_date, so this stays atomic.
+            current_streak = {"$switch": {
+                "branches": [
+                    {"case": {"$eq": ["$last_active_date", today.isoformat()]},
+                     "then": {"$ifNull": ["$current_streak", 1]}},
+                    {"case": {"$eq": ["$last_active_date", yesterday]},
+                     "then": {"$add": [{"$ifNull": ["$current_streak", 0]}, 1]}}
+                ],
+                "default": 1
+            }}
+            # Users from before the stored streak get it seeded once from their session
+            # dates, which already include the session just logged
+            user = collection.find_one(self._user_filter(user_id), {"current_streak": 1, "last_active_date": 1})
+            if user is not None and not ("current_streak" in user and "last_active_date" in user):
+                current_streak = max(1, self._session_date_streak(user_id, today))
+            
             collection.update_one(
-                {"_id": user_id},
-                {
-                    "$inc": {
-                        "total_learning_time": time_spent,
-                        "total_nodes_explored": nodes_count,
-                        "session_count": 1
-                    },
+                self._user_filter(user_id),
+                [{
                     "$set": {
-                        "last_active": datetime.datetime.now()
+                        "total_learning_time": {"$add": [{"$ifNull": ["$total_learning_time", 0]}, time_spent]},
+                        "total_nodes_explored": {"$add": [{"$ifNull": ["$total_nodes_explored", 0]}, nodes_count]},
+                        "session_count": {"$add": [{"$ifNull": ["$session_count", 0]}, 1]},
+                        "current_streak": current_streak,
+                        "last_active_date": today.isoformat(),
+                        "last_active": now
                     }
-                },
+                }],
                 upsert=False
             )
         except Exception as e:
@@ -236,85 +415,157 @@ class MongoDBConnection:
                 return image.read()
             return None
         except Exception as e:
-            st.error(f"Error retrieving graph image: {e}")
+            _err(f"Error retrieving graph image: {e}")
             return None
 
     def save_learning_session(self, user_id, topic, tree_id, time_spent, nodes_explored):
         """Save a learning session"""
         try:
+            timestamp = self.get_timestamp()
             session = {
                 "user_id": user_id,
                 "topic": topic,
                 "tree_id": tree_id,
-                "timestamp": self.get_timestamp(),
+                "timestamp": timestamp,
+                "session_date": timestamp.date().isoformat(),
                 "time_spent": time_spent,
-                "nodes_explored": nodes_explored
+                "nodes_explored": nodes_explored,
+                "node_count": len(nodes_explored)
             }
             result = self.learning_sessions.insert_one(session)
             return result.inserted_id
         except Exception as e:
-            st.error(f"Error saving learning session: {e}")
+            _err(f"Error saving learning session: {e}")
             return None
 
-    def get_learning_history(self, user_id, limit=10):
-        """Retrieve recent learning sessions"""
+    def get_learning_history(self, user_id, limit=10, projection=None):
+        """Retrieve recent learning sessions, optionally fetching only the projected fields"""
+        try:
+            return list(self.learning_sessions.find({"user_id": user_id}, projection).sort("timestamp", -1).limit(limit))
+        except Exception as e:
+            _err(f"Error retrieving learning history: {e}")
+            return []
+
+    def get_topic_aggregates(self, user_id):
+        """Per-topic session count, time spent and nodes explored, aggregated in MongoDB"""
+        try:
+            pipeline = [
+                {"$match": {"user_id": user_id}},
+                {"$group": {
+                    "_id": "$topic",
+                    "sessions": {"$sum": 1},
+                    "total_time": {"$sum": "$time_spent"},
+                    "nodes_explored": {"$sum": "$node_count"}
+                }},
+                {"$project": {"_id": 0, "topic": "$_id", "sessions": 1, "total_time": 1, "nodes_explored": 1}}
+            ]
+            return list(self.learning_sessions.aggregate(pipeline))
+        except Exception as e:
+            _err(f"Error aggregating topics: {e}")
+            return []
+
+    def get_daily_activity(self, user_id):
+        """Per-day time spent and nodes explored, oldest day first"""
         try:
-            return list(self.learning_sessions.find({"user_id": user_id}).sort("timestamp", -1).limit(limit))
+            pipeline = [
+                {"$match": {"user_id": user_id}},
+                {"$group": {
+                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                    "time_spent": {"$sum": "$time_spent"},
+                    "nodes_explored": {"$sum": "$node_count"}
+                }},
+                {"$sort": {"_id": 1}},
+                {"$project": {"_id": 0, "date": "$_id", "time_spent": 1, "nodes_explored": 1}}
+            ]
+            return list(self.learning_sessions.aggregate(pipeline))
         except Exception as e:
-            st.error(f"Error retrieving learning history: {e}")
+            _err(f"Error aggregating daily activity: {e}")
             return []
 
     def search_topics(self, user_id, query):
         """Search topics in knowledge trees"""
         return list(self.knowledge_trees.find({
             "user_id": user_id,
-            "topic": {"$regex": query, "$options": "i"}
+            "topic": {"$regex": re.escape(query), "$options": "i"}
         }))
 
-    def search_learning_history(self, user_id, query):
-        """Search past sessions by topic or nodes"""
+    def search_learning_history(self, user_id, query, limit=50):
+        """Search past sessions by topic or nodes, whole-word text matches first, then substring matches"""
         try:
-            topic_results = list(self.learning_sessions.find({
+            # The (nodes_explored, topic) text index answers whole-word matches directly
+            results = list(self.learning_sessions.find(
+                {"user_id": user_id, "$text": {"$search": query}},
+                {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit))
+            if len(results) >= limit:
+                return results
+
+            # Then substring matches on topic or nodes ("graph" also finds "GraphQL"), newest first
+            seen = [doc["_id"] for doc in results]
+            pattern = {"$regex": re.escape(query), "$options": "i"}
+            results.extend(self.learning_sessions.find({
                 "user_id": user_id,
-                "topic": {"$regex": query, "$options": "i"}
-            }).sort("timestamp", -1))
-
-            node_results = list(self.learning_sessions.find({
-                "user_id": user_id,
-                "nodes_explored": {"$regex": query, "$options": "i"}
-            }).sort("timestamp", -1))
-
-            combined_ids = {r["_id"] for r in topic_results}
-            unique_node_results = [r for r in node_results if r["_id"] not in combined_ids]
-            return topic_results + unique_node_results
+                "_id": {"$nin": seen},
+                "$or": [{"topic": pattern}, {"nodes_explored": pattern}]
+            }).sort("timestamp", -1).limit(limit - len(results)))
+            return results
 
         except Exception as e:
-            st.error(f"Error searching history: {e}")
+            _err(f"Error searching history: {e}")
             return []
 
+    def _user_filter(self, user_id):
+        """Match a user by id, whether stored as an ObjectId or given as its string form"""
+        if isinstance(user_id, str) and ObjectId.is_valid(user_id):
+            return {"_id": ObjectId(user_id)}
+        return {"_id": user_id}
+
+    def _get_learning_streak(self, user_id):
+        """Read the streak maintained on the user, falling back to the session dates"""
+        day = self.get_timestamp().date()
+        one_day = datetime.timedelta(days=1)
+        
+        user = self.users.find_one(self._user_filter(user_id), {"current_streak": 1, "last_active_date": 1})
+        if user and "current_streak" in user and "last_active_date" in user:
+            # A streak only survives while the last active day is today or yesterday
+            if user.get("last_active_date") in (day.isoformat(), (day - one_day).isoformat()):
+                return user["current_streak"]
+            return 0
+        return self._session_date_streak(user_id, day)
+
+    def _session_date_streak(self, user_id, day):
+        """Consecutive days with a session, counting back from day, from the session dates"""
+        one_day = datetime.timedelta(days=1)
+        # One distinct over the (user_id, session_date) index instead of a query per day
+        active_days = set(self.learning_sessions.distinct("session_date", {
+            "user_id": user_id,
+            "session_date": {"$gte": (day - 30 * one_day).isoformat()}
+        }))
+        streak = 0
+        while streak < 30 and day.isoformat() in active_days:
+            streak += 1
+            day -= one_day
+        return streak
+
     def get_learning_stats(self, user_id):
         """Aggregate learning stats"""
         try:
-            total_sessions = self.learning_sessions.count_documents({"user_id": user_id})
-            distinct_topics = len(self.learning_sessions.distinct("topic", {"user_id": user_id}))
-
+            # Session count, topic count and total time in a single round trip
             pipeline = [
                 {"$match": {"user_id": user_id}},
-                {"$group": {"_id": None, "total_time": {"$sum": "$time_spent"}}}
+                {"$facet": {
+                    "total": [{"$count": "n"}],
+                    "topics": [{"$group": {"_id": "$topic"}}, {"$count": "n"}],
+                    "time": [{"$group": {"_id": None, "total_time": {"$sum": "$time_spent"}}}]
+                }}
             ]
             result = list(self.learning_sessions.aggregate(pipeline))
-            total_time = result[0]["total_time"] if result else 0
-
-            now = datetime.datetime.utcnow()
-            streak = 0
-            for i in range(30):
-                day = now.date() - datetime.timedelta(days=i)
-                start = datetime.datetime.combine(day, datetime.time.min)
-                end = datetime.datetime.combine(day, datetime.time.max)
-                if self.learning_sessions.count_documents({"user_id": user_id, "timestamp": {"$gte": start, "$lte": end}}) > 0:
-                    streak += 1
-                else:
-                    break
+            facets = result[0] if result else {}
+            total_sessions = facets["total"][0]["n"] if facets.get("total") else 0
+            distinct_topics = facets["topics"][0]["n"] if facets.get("topics") else 0
+            total_time = facets["time"][0]["total_time"] if facets.get("time") else 0
+
+            streak = self._get_learning_streak(user_id)
 
             return {
                 "total_sessions": total_sessions,
@@ -324,7 +575,7 @@ class MongoDBConnection:
             }
 
         except Exception as e:
-            st.error(f"Error calculating stats: {e}")
+            _err(f"Error calculating stats: {e}")
             return {
                 "total_sessions": 0,
                 "topics_explored": 0,
@@ -332,25 +583,47 @@ class MongoDBConnection:
                 "learning_streak": 0
             }
 
+# Backfills in the order they were introduced; append new ones, never reorder
+_MIGRATIONS = [
+    MongoDBConnection._backfill_node_count,
+    MongoDBConnection._backfill_session_date,
+]
+
 # Dummy fallback for testing
 class DummyCollection:
+    # Fields looked up through a dict instead of scanning, mirroring the Mongo indexes;
+    # insert_one is the only write, so it is the only place the buckets are kept up to date
+    INDEXED_FIELDS = ("_id", "email", "user_id")
+
     def __init__(self):
         self.data = []
         self.counter = 1
+        self._indexes = {field: defaultdict(list) for field in self.INDEXED_FIELDS}
 
     def insert_one(self, document):
         document["_id"] = str(self.counter)
         self.counter += 1
         self.data.append(document)
+        for field, index in self._indexes.items():
+            if field in document:
+                index[document[field]].append(document)
         return DummyResult(document["_id"])
 
+    def _candidates(self, query):
+        """Narrow the scan to one index bucket when the query hits an indexed field"""
+        for field in self.INDEXED_FIELDS:
+            # Operator dicts and lists can't be bucket keys; scan for those
+            if field in query and isinstance(query[field], Hashable):
+                return self._indexes[field].get(query[field], [])
+        return self.data
+
     def find(self, query=None):
         if not query:
             return self.data
-        return [doc for doc in self.data if all(doc.get(k) == v for k, v in query.items())]
+        return [doc for doc in self._candidates(query) if all(doc.get(k) == v for k, v in query.items())]
 
     def find_one(self, query):
-        return next((doc for doc in self.data if all(doc.get(k) == v for k, v in query.items())), None)
+        return next((doc for doc in self._candidates(query) if all(doc.get(k) == v for k, v in query.items())), None)
 
     def count_documents(self, query):
         return len(self.find(query))
@@ -369,8 +642,12 @@ class DummyResult:
 def get_db_connection():
     global _db_connection
     if _db_connection is None:
-        _db_connection = MongoDBConnection()
-        _db_connection.connect()
+        # Streamlit serves each session on its own thread; only one may build the client
+        with _db_connection_lock:
+            if _db_connection is None:
+                connection = MongoDBConnection()
+                connection.connect()
+                _db_connection = connection
     return _db_connection
 
 # Example usage
@@ -387,12 +664,12 @@ def get_session_by_id(self, session_id):
     try:
         return self.learning_sessions.find_one({"_id": ObjectId(session_id)})
     except Exception as e:
-        st.error(f"Error retrieving session by ID: {e}")
+        _err(f"Error retrieving session by ID: {e}")
         return None
 
-def get_all_sessions():
+def get_all_sessions(limit=500, projection=None):
     db = get_db_connection()
-    return db.get_all_sessions()
+    return db.get_all_sessions(limit=limit, projection=projection)
 
 def search_sessions(query):
     """Search for learning sessions based on a search query"""
@@ -401,12 +678,12 @@ def search_sessions(query):
         # Search in both topic and nodes_explored fields
         return list(db.learning_sessions.find({
             "$or": [
-                {"topic": {"$regex": query, "$options": "i"}},
-                {"nodes_explored": {"$regex": query, "$options": "i"}}
+                {"topic": {"$regex": re.escape(query), "$options": "i"}},
+                {"nodes_explored": {"$regex": re.escape(query), "$options": "i"}}
             ]
         }).sort("timestamp", -1))
     except Exception as e:
-        st.error(f"Error searching sessions: {e}")
+        _err(f"Error searching sessions: {e}")
         return []
 
 def get_session_by_id(session_id):
@@ -415,5 +692,5 @@ def get_session_by_id(session_id):
     try:
         return db.learning_sessions.find_one({"_id": ObjectId(session_id)})
     except Exception as e:
-        st.error(f"Error retrieving session by ID: {e}")
+        _err(f"Error retrieving session by ID: {e}")
         return None
\ No newline at end of file
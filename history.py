@@ -1,9 +1,21 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from db import get_db_connection
+from utils import DATETIME_FORMAT
+
+SEARCH_PAGE_SIZE = 20
+
+# Daily charts switch to weekly buckets past this span, and to WebGL past this many points
+DAILY_RESAMPLE_DAYS = 120
+WEBGL_POINTS = 200
+
+# Session fields the history page renders; everything else stays in Mongo
+HISTORY_FIELDS = {"topic": 1, "timestamp": 1, "time_spent": 1, "node_count": 1, "tree_id": 1}
 
 def format_time_spent(seconds):
     """Format seconds into readable time"""
@@ -13,10 +25,347 @@ def format_time_spent(seconds):
         minutes = seconds // 60
         return f"{minutes} minute{'s' if minutes != 1 else ''}"
     else:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
+        hours, remainder = divmod(seconds, 3600)
+        minutes = remainder // 60
         return f"{hours} hour{'s' if hours != 1 else ''} {minutes} minute{'s' if minutes != 1 else ''}"
 
+def format_time_spent_series(seconds):
+    """Vectorised format_time_spent for a Series of seconds"""
+    seconds = seconds.astype("int64")
+    minutes_total = seconds // 60
+    hours, remainder = seconds.divmod(3600)
+    minutes = remainder // 60
+    
+    def with_unit(values, unit):
+        return values.astype(str) + f" {unit}" + np.where(values != 1, "s", "")
+    
+    return pd.Series(np.select(
+        [seconds < 60, seconds < 3600],
+        [seconds.astype(str) + " seconds", with_unit(minutes_total, "minute")],
+        default=with_unit(hours, "hour") + " " + with_unit(minutes, "minute")
+    ), index=seconds.index)
+
+# Static styling for the history tabs, built once at import
+TAB_CSS = """
+    <style>
+        .stTabs [data-baseweb="tab"] {
+            font-size: 2.5rem; 
+            width: 100%;
+            justify-content: center;
+        }
+        .stTabs [data-baseweb="tab-list"] {
+            display: flex;
+            width: 100%;
+        }
+    </style>
+"""
+
+# Every widget interaction reruns the page; reuse recent reads instead of querying Mongo each time
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_history(user_id, limit):
+    return get_db_connection().get_learning_history(user_id, limit=limit, projection=HISTORY_FIELDS)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_stats(user_id):
+    return get_db_connection().get_learning_stats(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_topic_aggregates(user_id):
+    return get_db_connection().get_topic_aggregates(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_daily_activity(user_id):
+    return get_db_connection().get_daily_activity(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_search(user_id, query):
+    return get_db_connection().search_learning_history(user_id, query)
+
+@st.cache_data(show_spinner=False)
+def _build_overview_figure(topic_stats, daily):
+    """Build the Overview charts as one 2x2 Plotly dict, rebuilt only when the aggregates change"""
+    # Long histories are bucketed by week so the daily charts keep a bounded marker count
+    activity = daily.set_index(pd.to_datetime(daily["date"]))[["time_spent", "nodes_explored"]]
+    if len(activity) and (activity.index.max() - activity.index.min()).days > DAILY_RESAMPLE_DAYS:
+        activity = activity.resample("W").sum()
+        period = "Week"
+    else:
+        period = "Day"
+    dates = activity.index.to_numpy()
+    scatter = go.Scattergl if len(activity) > WEBGL_POINTS else go.Scatter
+    
+    # One figure means one payload and one Plotly render for the whole tab
+    fig = make_subplots(
+        rows=2,
+        cols=2,
+        subplot_titles=(
+            "Most Explored Topics",
+            "Time Spent per Topic (minutes)",
+            f"Time Spent Learning per {period} (minutes)",
+            f"Nodes Explored per {period}"
+        ),
+        vertical_spacing=0.15,
+        horizontal_spacing=0.15
+    )
+    
+    # Most explored topics chart
+    topic_df = topic_stats[["topic", "sessions"]].sort_values("sessions", ascending=False).head(10)
+    sessions = topic_df["sessions"].to_numpy()
+    fig.add_trace(go.Bar(
+        x=sessions,
+        y=topic_df["topic"].to_numpy(),
+        orientation='h',
+        marker=dict(color=sessions, colorscale=px.colors.sequential.Purples)
+    ), row=1, col=1)
+    fig.update_xaxes(title_text="Number of Sessions", row=1, col=1)
+    
+    # Time spent per topic chart
+    time_df = pd.DataFrame({
+        "topic": topic_stats["topic"],
+        "time_spent": topic_stats["total_time"] / 60  # Convert to minutes
+    }).sort_values("time_spent", ascending=False).head(10)
+    minutes = time_df["time_spent"].to_numpy()
+    fig.add_trace(go.Bar(
+        x=minutes,
+        y=time_df["topic"].to_numpy(),
+        orientation='h',
+        marker=dict(color=minutes, colorscale=px.colors.sequential.Viridis)
+    ), row=1, col=2)
+    fig.update_xaxes(title_text="Time (minutes)", row=1, col=2)
+    
+    # Time spent per day
+    fig.add_trace(scatter(
+        x=dates,
+        y=(activity["time_spent"] / 60).to_numpy(),  # Convert to minutes
+        mode="lines+markers",
+        line_color="#6200EA"
+    ), row=2, col=1)
+    fig.update_yaxes(title_text="Time (minutes)", row=2, col=1)
+    
+    # Nodes explored per day
+    fig.add_trace(scatter(
+        x=dates,
+        y=activity["nodes_explored"].to_numpy(),
+        mode="lines+markers",
+        line_color="#00BFA5"
+    ), row=2, col=2)
+    fig.update_yaxes(title_text="Nodes", row=2, col=2)
+    
+    fig.update_layout(height=800, showlegend=False)
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def _build_depth_figure(topic_depth_df):
+    """Topic depth scatter as a Plotly dict, rebuilt only when the topic aggregates change"""
+    fig = px.scatter(
+        topic_depth_df,
+        x="avg_nodes_per_session",
+        y="avg_time_per_node",
+        size="total_sessions",
+        color="total_sessions",
+        hover_name="topic",
+        size_max=40,
+        title="Topic Exploration Depth Analysis",
+        labels={
+            "avg_nodes_per_session": "Avg. Nodes per Session",
+            "avg_time_per_node": "Avg. Minutes per Node",
+            "total_sessions": "Total Sessions"
+        }
+    )
+    fig.update_layout(height=500)
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def _build_efficiency_figure(eff_df):
+    """Learning efficiency line as a Plotly dict, rebuilt only when the sessions change"""
+    fig = px.line(
+        eff_df,
+        x="session_number",
+        y="efficiency",
+        title="Learning Efficiency Over Time (Nodes per Minute)",
+        labels={
+            "session_number": "Session Number",
+            "efficiency": "Efficiency (Nodes/Minute)",
+            "topic": "Topic"
+        },
+        hover_data=["date", "topic"],
+        markers=True
+    )
+    fig.update_traces(line_color="#FF4081")
+    return fig.to_dict()
+
+@st.fragment
+def _search_fragment():
+    """Search tab, isolated so submitting a query or paging reruns only this section"""
+    st.markdown("### 🔍 Search Your Learning History")
+
+    # Search input; the form only reruns on submit rather than on every keystroke
+    with st.form("search_form"):
+        search_query = st.text_input("Search topics or concepts you've explored:")
+        st.form_submit_button("Search")
+
+    if search_query:
+        # Search in database
+        search_results = _cached_search(st.session_state.user_id, search_query)
+
+        if search_results:
+            st.success(f"Found {len(search_results)} results for '{search_query}'")
+
+            # Only materialise one page of result widgets per rerun
+            page_count = max(1, -(-len(search_results) // SEARCH_PAGE_SIZE))
+            if st.session_state.get("search_page_query") != search_query:
+                st.session_state.search_page_query = search_query
+                st.session_state.search_page = 1
+            page = st.number_input(
+                "Page",
+                min_value=1,
+                max_value=page_count,
+                key="search_page"
+            ) if page_count > 1 else 1
+            start = (page - 1) * SEARCH_PAGE_SIZE
+
+            # Display search results
+            for result in search_results[start:start + SEARCH_PAGE_SIZE]:
+                with st.expander(f"**{result['topic']}** - {result['timestamp'].strftime('%Y-%m-%d')}"):
+                    # One markdown element per result instead of one per line
+                    details = [
+                        f"**Time spent:** {format_time_spent(result['time_spent'])}",
+                        f"**Nodes explored:** {result['node_count']}"
+                    ]
+                    if "nodes_explored" in result and result["nodes_explored"]:
+                        details.append("**Concepts explored:**")
+                        details.append(", ".join(result["nodes_explored"]))
+                    st.markdown("\n\n".join(details))
+
+                    # Button to revisit this topic
+                    if st.button(f"Continue exploring '{result['topic']}'", key=f"search_{result['_id']}"):
+                        st.session_state.load_tree_id = result["tree_id"]
+                        st.session_state.load_topic = result["topic"]
+                        st.session_state.current_page = "visualizer"
+                        st.rerun()
+        else:
+            st.info(f"No results found for '{search_query}'")
+
+def _render_overview(learning_stats, topic_stats, daily):
+    """Overview tab: headline stats and the cached activity charts"""
+    st.markdown("### 📊 Learning Analytics")
+
+    # Display summary stats
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Total Sessions", learning_stats["total_sessions"])
+
+    with col2:
+        st.metric("Topics Explored", learning_stats["topics_explored"])
+
+    with col3:
+        total_hours = learning_stats["total_time"] / 3600
+        st.metric("Total Hours", f"{total_hours:.1f}")
+
+    with col4:
+        st.metric("Learning Streak", f"{learning_stats['learning_streak']} days")
+
+    # Create analytics charts
+    st.markdown("### 📈 Learning Activity Over Time")
+    st.plotly_chart(_build_overview_figure(topic_stats, daily), use_container_width=True)
+
+def _render_analytics(history_df, topic_stats):
+    """Analytics tab: topic depth and learning efficiency"""
+    st.markdown("### 📈 Advanced Analytics")
+
+    # Topic knowledge depth analysis, computed column-wise from the topic aggregates
+    avg_time_per_node = (topic_stats["total_time"] / topic_stats["nodes_explored"]).where(topic_stats["nodes_explored"] > 0, 0)
+    topic_depth_df = pd.DataFrame({
+        "topic": topic_stats["topic"],
+        "avg_nodes_per_session": topic_stats["nodes_explored"] / topic_stats["sessions"],
+        "avg_time_per_node": avg_time_per_node / 60,  # Convert to minutes
+        "total_sessions": topic_stats["sessions"]
+    })
+
+    if not topic_depth_df.empty:
+        # Topic depth scatter plot
+        st.plotly_chart(_build_depth_figure(topic_depth_df), use_container_width=True)
+
+        # Learning efficiency over time
+        if len(history_df) > 3:  # Only show if we have enough data
+            # Sort history by timestamp and number every session before filtering
+            sorted_history = history_df.sort_values("timestamp", ignore_index=True)
+            sorted_history["session_number"] = sorted_history.index + 1
+            active = sorted_history[(sorted_history["time_spent"] > 0) & (sorted_history["node_count"] > 0)]
+            eff_df = pd.DataFrame({
+                "session_number": active["session_number"],
+                "date": active["date"],
+                "efficiency": active["node_count"] / (active["time_spent"] / 60),  # Nodes per minute
+                "topic": active["topic"]
+            })
+
+            if not eff_df.empty:
+                st.plotly_chart(_build_efficiency_figure(eff_df), use_container_width=True)
+
+@st.fragment
+def _render_sessions(history_df):
+    """Sessions tab, isolated so selecting a row reruns only this section"""
+    st.markdown("### 📑 Session History")
+
+    # Create a dataframe of sessions, formatting dates column-wise rather than per row.
+    # get_learning_history already returns them most recent first, so no re-sort is needed.
+    sessions_df = pd.DataFrame({
+        "date": history_df["timestamp"].dt.strftime(DATETIME_FORMAT),
+        "topic": history_df["topic"],
+        "time_spent": format_time_spent_series(history_df["time_spent"]),
+        "nodes_explored": history_df["node_count"],
+        "session_id": history_df["_id"].astype(str),  # For identification
+        "tree_id": history_df["tree_id"]  # For linking to the graph
+    })
+
+    if not sessions_df.empty:
+        # Display table with highlighting; selecting a row opens its details.
+        # column_order hides the identifiers without copying the frame.
+        selection = st.dataframe(
+            sessions_df,
+            hide_index=True,
+            column_order=["date", "topic", "time_spent", "nodes_explored"],
+            column_config={
+                "date": "Date & Time",
+                "topic": "Topic",
+                "time_spent": "Time Spent",
+                "nodes_explored": "Nodes Explored"
+            },
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="sessions_table"
+        )
+        selected_rows = selection.selection.rows
+
+        if not selected_rows:
+            st.caption("Select a session in the table to view details.")
+        else:
+            # Get session details
+            session_row = sessions_df.iloc[selected_rows[0]]
+
+            st.markdown(f"### Session Details: {session_row['topic']}")
+
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.metric("Date", session_row["date"])
+
+            with col2:
+                st.metric("Time Spent", session_row["time_spent"])
+
+            with col3:
+                st.metric("Nodes Explored", session_row["nodes_explored"])
+
+            # Option to revisit this topic in visualizer
+            if st.button(f"📚 Continue exploring '{session_row['topic']}'"):
+                # Store tree_id in session state to load the graph in visualizer
+                st.session_state.load_tree_id = session_row["tree_id"]
+                st.session_state.load_topic = session_row["topic"]
+                st.session_state.current_page = "visualizer"
+                st.rerun()
+
 def show_history():
     """Display user's learning history and analytics"""
     st.markdown("<h1 class='main-header'>📚 Learning History</h1>", unsafe_allow_html=True)
@@ -29,11 +378,16 @@ def show_history():
             st.rerun()
         return
     
-    # Connect to database
-    db = get_db_connection()
+    # History reads are cached for a minute; let the user pull fresh data on demand
+    if st.button("🔄 Refresh", key="history_refresh"):
+        _cached_history.clear()
+        _cached_stats.clear()
+        _cached_topic_aggregates.clear()
+        _cached_daily_activity.clear()
+        _cached_search.clear()
     
     # Get user's learning history
-    history = db.get_learning_history(st.session_state.user_id, limit=100)
+    history = _cached_history(st.session_state.user_id, 100)
     
     if not history:
         st.info("You haven't explored any topics yet. Start learning to build your history!")
@@ -42,343 +396,41 @@ def show_history():
             st.rerun()
         return
     
+    # Tabular view of the history shared by the tabs below; node counts are stored on each session
+    history_df = pd.DataFrame(history)
+    # Topics repeat across sessions and the counters are small, so keep the frame compact
+    history_df = history_df.astype({"topic": "category", "time_spent": "int32", "node_count": "int32"})
+    history_df["timestamp"] = pd.to_datetime(history_df["timestamp"])
+    history_df["date"] = history_df["timestamp"].dt.date
+    
     # Get comprehensive learning stats
-    learning_stats = db.get_learning_stats(st.session_state.user_id)
+    learning_stats = _cached_stats(st.session_state.user_id)
+    
+    # Per-topic and per-day totals are grouped in MongoDB, so only the aggregates come back
+    topic_stats = pd.DataFrame(
+        _cached_topic_aggregates(st.session_state.user_id),
+        columns=["topic", "sessions", "total_time", "nodes_explored"]
+    )
+    daily = pd.DataFrame(
+        _cached_daily_activity(st.session_state.user_id),
+        columns=["date", "time_spent", "nodes_explored"]
+    )
+    daily["date"] = pd.to_datetime(daily["date"]).dt.date
     
-    st.markdown("""
-        <style>
-            .stTabs [data-baseweb="tab"] {
-                font-size: 2.5rem; 
-                width: 100%;
-                justify-content: center;
-            }
-            .stTabs [data-baseweb="tab-list"] {
-                display: flex;
-                width: 100%;
-            }
-        </style>
-    """, unsafe_allow_html=True)
+    st.markdown(TAB_CSS, unsafe_allow_html=True)
     
-    # Create tabs for different views
+    # Create tabs for different views. Interactive tabs are fragments, so their widgets
+    # rerun only their own tab instead of rebuilding every tab's charts.
     tab1, tab2, tab3, tab4 = st.tabs(["Overview", "Analytics", "Sessions", "🔍 Search"])
     
     with tab1:
-        st.markdown("### 📊 Learning Analytics")
-        
-        # Display summary stats
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Total Sessions", learning_stats["total_sessions"])
-        
-        with col2:
-            st.metric("Topics Explored", learning_stats["topics_explored"])
-            
-        with col3:
-            total_hours = learning_stats["total_time"] / 3600
-            st.metric("Total Hours", f"{total_hours:.1f}")
-            
-        with col4:
-            st.metric("Learning Streak", f"{learning_stats['learning_streak']} days")
-        
-        # Process data for analytics
-        topics = {}
-        time_data = []
-        nodes_data = []
-        
-        for session in history:
-            topic = session["topic"]
-            timestamp = session["timestamp"]
-            time_spent = session["time_spent"]
-            nodes_explored = len(session["nodes_explored"])
-            
-            # Aggregate by topic
-            if topic not in topics:
-                topics[topic] = {
-                    "sessions": 0,
-                    "total_time": 0,
-                    "nodes_explored": 0
-                }
-            
-            topics[topic]["sessions"] += 1
-            topics[topic]["total_time"] += time_spent
-            topics[topic]["nodes_explored"] += nodes_explored
-            
-            # Data for time series
-            time_data.append({
-                "date": timestamp.date(),
-                "time_spent": time_spent / 60  # Convert to minutes
-            })
-            
-            nodes_data.append({
-                "date": timestamp.date(),
-                "nodes_explored": nodes_explored
-            })
-        
-        # Create analytics charts
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Most explored topics chart
-            topic_df = pd.DataFrame([
-                {"topic": topic, "sessions": data["sessions"]}
-                for topic, data in topics.items()
-            ])
-            
-            if not topic_df.empty:
-                topic_df = topic_df.sort_values("sessions", ascending=False).head(10)
-                
-                fig = px.bar(
-                    topic_df, 
-                    x="sessions", 
-                    y="topic", 
-                    orientation='h',
-                    title="Most Explored Topics",
-                    labels={"sessions": "Number of Sessions", "topic": "Topic"},
-                    color="sessions",
-                    color_continuous_scale=px.colors.sequential.Purples
-                )
-                
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Time spent per topic chart
-            time_df = pd.DataFrame([
-                {"topic": topic, "time_spent": data["total_time"] / 60}  # Convert to minutes
-                for topic, data in topics.items()
-            ])
-            
-            if not time_df.empty:
-                time_df = time_df.sort_values("time_spent", ascending=False).head(10)
-                
-                fig = px.bar(
-                    time_df, 
-                    x="time_spent", 
-                    y="topic", 
-                    orientation='h',
-                    title="Time Spent per Topic (minutes)",
-                    labels={"time_spent": "Time (minutes)", "topic": "Topic"},
-                    color="time_spent",
-                    color_continuous_scale=px.colors.sequential.Viridis
-                )
-                
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        # Time series chart
-        st.markdown("### 📈 Learning Activity Over Time")
-        
-        # Process data for time series
-        df_time = pd.DataFrame(time_data)
-        if not df_time.empty:
-            df_time = df_time.groupby("date").sum().reset_index()
-            df_time = df_time.sort_values("date")
-            
-            fig = px.line(
-                df_time, 
-                x="date", 
-                y="time_spent",
-                title="Time Spent Learning per Day (minutes)",
-                labels={"time_spent": "Time (minutes)", "date": "Date"},
-                markers=True
-            )
-            
-            fig.update_traces(line_color="#6200EA")
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Nodes explored
-        df_nodes = pd.DataFrame(nodes_data)
-        if not df_nodes.empty:
-            df_nodes = df_nodes.groupby("date").sum().reset_index()
-            df_nodes = df_nodes.sort_values("date")
-            
-            fig = px.line(
-                df_nodes, 
-                x="date", 
-                y="nodes_explored",
-                title="Nodes Explored per Day",
-                labels={"nodes_explored": "Nodes", "date": "Date"},
-                markers=True
-            )
-            
-            fig.update_traces(line_color="#00BFA5")
-            st.plotly_chart(fig, use_container_width=True)
+        _render_overview(learning_stats, topic_stats, daily)
     
     with tab2:
-        st.markdown("### 📈 Advanced Analytics")
-        
-        # Topic knowledge depth analysis
-        topic_depth_data = []
-        
-        for topic, data in topics.items():
-            avg_nodes_per_session = data["nodes_explored"] / data["sessions"] if data["sessions"] > 0 else 0
-            avg_time_per_node = data["total_time"] / data["nodes_explored"] if data["nodes_explored"] > 0 else 0
-            
-            topic_depth_data.append({
-                "topic": topic,
-                "avg_nodes_per_session": avg_nodes_per_session,
-                "avg_time_per_node": avg_time_per_node / 60,  # Convert to minutes
-                "total_sessions": data["sessions"]
-            })
-        
-        topic_depth_df = pd.DataFrame(topic_depth_data)
-        
-        if not topic_depth_df.empty:
-            # Topic depth scatter plot
-            fig = px.scatter(
-                topic_depth_df,
-                x="avg_nodes_per_session",
-                y="avg_time_per_node",
-                size="total_sessions",
-                color="total_sessions",
-                hover_name="topic",
-                size_max=40,
-                title="Topic Exploration Depth Analysis",
-                labels={
-                    "avg_nodes_per_session": "Avg. Nodes per Session",
-                    "avg_time_per_node": "Avg. Minutes per Node",
-                    "total_sessions": "Total Sessions"
-                }
-            )
-            
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Learning efficiency over time
-            if len(history) > 3:  # Only show if we have enough data
-                efficiency_data = []
-                
-                # Sort history by timestamp
-                sorted_history = sorted(history, key=lambda x: x["timestamp"])
-                
-                for i, session in enumerate(sorted_history):
-                    if session["time_spent"] > 0 and len(session["nodes_explored"]) > 0:
-                        efficiency = len(session["nodes_explored"]) / (session["time_spent"] / 60)  # Nodes per minute
-                        efficiency_data.append({
-                            "session_number": i + 1,
-                            "date": session["timestamp"].date(),
-                            "efficiency": efficiency,
-                            "topic": session["topic"]
-                        })
-                
-                if efficiency_data:
-                    eff_df = pd.DataFrame(efficiency_data)
-                    
-                    fig = px.line(
-                        eff_df,
-                        x="session_number",
-                        y="efficiency",
-                        title="Learning Efficiency Over Time (Nodes per Minute)",
-                        labels={
-                            "session_number": "Session Number",
-                            "efficiency": "Efficiency (Nodes/Minute)",
-                            "topic": "Topic"
-                        },
-                        hover_data=["date", "topic"],
-                        markers=True
-                    )
-                    
-                    fig.update_traces(line_color="#FF4081")
-                    st.plotly_chart(fig, use_container_width=True)
+        _render_analytics(history_df, topic_stats)
     
     with tab3:
-        st.markdown("### 📑 Session History")
-        
-        # Create a dataframe of sessions
-        sessions_data = []
-        
-        for session in history:
-            sessions_data.append({
-                "date": session["timestamp"].strftime("%Y-%m-%d %H:%M"),
-                "topic": session["topic"],
-                "time_spent": format_time_spent(session["time_spent"]),
-                "nodes_explored": len(session["nodes_explored"]),
-                "raw_timestamp": session["timestamp"],  # For sorting
-                "session_id": str(session["_id"]),  # For identification
-                "tree_id": session["tree_id"]  # For linking to the graph
-            })
-        
-        # Sort by timestamp (most recent first)
-        sessions_df = pd.DataFrame(sessions_data).sort_values("raw_timestamp", ascending=False)
-        
-        if not sessions_df.empty:
-            # Remove raw timestamp from display
-            display_df = sessions_df.drop(columns=["raw_timestamp", "session_id", "tree_id"])
-            
-            # Display table with highlighting
-            st.dataframe(
-                display_df,
-                hide_index=True,
-                column_config={
-                    "date": "Date & Time",
-                    "topic": "Topic",
-                    "time_spent": "Time Spent",
-                    "nodes_explored": "Nodes Explored"
-                },
-                use_container_width=True
-            )
-            
-            # Session selection for details
-            selected_session = st.selectbox(
-                "Select a session to view details:",
-                options=sessions_df["session_id"].tolist(),
-                format_func=lambda x: f"{sessions_df[sessions_df['session_id'] == x]['date'].values[0]} - {sessions_df[sessions_df['session_id'] == x]['topic'].values[0]}"
-            )
-            
-            if selected_session:
-                # Get session details
-                session_row = sessions_df[sessions_df["session_id"] == selected_session].iloc[0]
-                
-                st.markdown(f"### Session Details: {session_row['topic']}")
-                
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Date", session_row["date"])
-                
-                with col2:
-                    st.metric("Time Spent", session_row["time_spent"])
-                
-                with col3:
-                    st.metric("Nodes Explored", session_row["nodes_explored"])
-                
-                # Option to revisit this topic in visualizer
-                if st.button(f"📚 Continue exploring '{session_row['topic']}'"):
-                    # Store tree_id in session state to load the graph in visualizer
-                    st.session_state.load_tree_id = session_row["tree_id"]
-                    st.session_state.load_topic = session_row["topic"]
-                    st.session_state.current_page = "visualizer"
-                    st.rerun()
+        _render_sessions(history_df)
     
     with tab4:
-        st.markdown("### 🔍 Search Your Learning History")
-        
-        # Search input
-        search_query = st.text_input("Search topics or concepts you've explored:")
-        
-        if search_query:
-            # Search in database
-            search_results = db.search_learning_history(st.session_state.user_id, search_query)
-            
-            if search_results:
-                st.success(f"Found {len(search_results)} results for '{search_query}'")
-                
-                # Display search results
-                for result in search_results:
-                    with st.expander(f"**{result['topic']}** - {result['timestamp'].strftime('%Y-%m-%d')}"):
-                        st.write(f"**Time spent:** {format_time_spent(result['time_spent'])}")
-                        st.write(f"**Nodes explored:** {len(result['nodes_explored'])}")
-                        
-                        if "nodes_explored" in result and result["nodes_explored"]:
-                            st.write("**Concepts explored:**")
-                            st.write(", ".join(result["nodes_explored"]))
-                        
-                        # Button to revisit this topic
-                        if st.button(f"Continue exploring '{result['topic']}'", key=f"search_{result['_id']}"):
-                            st.session_state.load_tree_id = result["tree_id"]
-                            st.session_state.load_topic = result["topic"]
-                            st.session_state.current_page = "visualizer"
-                            st.rerun()
-            else:
-                st.info(f"No results found for '{search_query}'")
\ No newline at end of file
+        _search_fragment()
@@ -1,11 +1,10 @@
+import html
+import time
 import streamlit as st
 from utils import get_base64_image
 
-def show_landing(authenticated=False):
-    """Display an enhanced landing page with smooth animations and improved UI for NodeLearn"""
-    
-    # CSS for animations and styling - with toned down colors
-    st.markdown("""
+# Static landing page styling, built once at import
+LANDING_CSS = """
     <style>
         /* Base styles */
         body {
@@ -91,6 +90,12 @@ def show_landing(authenticated=False):
             line-height: 1.5;
         }
         
+        .feature-grid {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            column-gap: 1rem;
+        }
+        
         .hero-section {
             padding: 2.5rem 1rem;
             text-align: center;
@@ -242,9 +247,31 @@ def show_landing(authenticated=False):
             .sub-header {
                 font-size: 1.4rem !important;
             }
+            
+            .feature-grid {
+                grid-template-columns: 1fr;
+            }
         }
     </style>
-    """, unsafe_allow_html=True)
+"""
+
+# Clicks closer together than this are treated as one navigation; a double-click on a
+# nav button otherwise queues a second rerun that fires its callback again
+NAV_THROTTLE_SECONDS = 0.5
+
+def _navigate(page):
+    """Button callback: switch page before the click's own rerun, ignoring rapid repeat clicks"""
+    now = time.monotonic()
+    if now - st.session_state.get("_last_nav", 0) < NAV_THROTTLE_SECONDS:
+        return
+    st.session_state._last_nav = now
+    st.session_state.current_page = page
+
+def show_landing(authenticated=False):
+    """Display an enhanced landing page with smooth animations and improved UI for NodeLearn"""
+    
+    # CSS for animations and styling - with toned down colors
+    st.markdown(LANDING_CSS, unsafe_allow_html=True)
     
     # Logo and Hero Section
     with st.container():
@@ -264,35 +291,24 @@ def show_landing(authenticated=False):
             if not authenticated:
                 col_a, col_b, col_c = st.columns([1, 1, 1])
                 with col_a:
-                    if st.button("✨ Connect with Google", key="demo_button", use_container_width=True):
-                        st.session_state.current_page = 'google_auth'
-                        st.rerun()
+                    st.button("✨ Connect with Google", key="demo_button", on_click=_navigate, args=('google_auth',), use_container_width=True)
                 with col_b:
-                    if st.button("🔑 Login", key="login_button", use_container_width=True):
-                        st.session_state.current_page = 'login'
-                        st.rerun()
+                    st.button("🔑 Login", key="login_button", on_click=_navigate, args=('login',), use_container_width=True)
                 with col_c:
-                    if st.button("📝 Sign Up", key="signup_button", use_container_width=True):
-                        st.session_state.current_page = 'signup'
-                        st.rerun()
+                    st.button("📝 Sign Up", key="signup_button", on_click=_navigate, args=('signup',), use_container_width=True)
             else:
                 # Personalized welcome for authenticated users
-                st.markdown(f"<h3 style='color:#b39ddb;'>Welcome back, {st.session_state.get('user_name', 'Explorer')}!</h3>", unsafe_allow_html=True)
+                st.markdown(f"<h3 style='color:#b39ddb;'>Welcome back, {html.escape(st.session_state.get('user_name') or 'Explorer')}!</h3>", unsafe_allow_html=True)
                 col_a, col_b = st.columns([1, 1])
                 with col_a:
-                    if st.button("🌳 Continue Learning", key="continue_button", use_container_width=True):
-                        st.session_state.current_page = 'visualizer'
-                        st.rerun()
+                    st.button("🌳 Continue Learning", key="continue_button", on_click=_navigate, args=('visualizer',), use_container_width=True)
                 with col_b:
-                    if st.button("📚 View History", key="history_button", use_container_width=True):
-                        st.session_state.current_page = 'history'
-                        st.rerun()
+                    st.button("📚 View History", key="history_button", on_click=_navigate, args=('history',), use_container_width=True)
             st.markdown("</div>", unsafe_allow_html=True)
     
-    # What is NodeLearn section with static image instead of Lottie
-    st.markdown("<h2 class='section-header'>🌟 Reimagine How You Learn</h2>", unsafe_allow_html=True)
-    
+    # What is NodeLearn section with static image instead of Lottie, plus the key stats heading
     st.markdown("""
+        <h2 class='section-header'>🌟 Reimagine How You Learn</h2>
         <div style='animation: fadeIn 1.4s ease-out;'>
             <p style='font-size: 2.0rem; line-height: 3.0; color: #d1c4e9;'>
                 <b>NodeLearn</b> revolutionizes education by transforming complex topics into <span style='color: #d158e9;'>interactive visual knowledge trees</span>.
@@ -310,11 +326,10 @@ def show_landing(authenticated=False):
                 The future of learning is <span style='color: #d158e9;'>interconnected</span>, <span style='color: #7c4dff;'>visual</span>, and <span style='color: #9c27b0;'>personalized</span>.
             </p>
         </div>
+        
+        <h2 class='section-header'>🔢 NodeLearn Impact</h2>
         """, unsafe_allow_html=True)
     
-    # Key stats section (for visual impact)
-    st.markdown("<h2 class='section-header'>🔢 NodeLearn Impact</h2>", unsafe_allow_html=True)
-    
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -367,19 +382,14 @@ def show_landing(authenticated=False):
         },
     ]
     
-    # Display features in a 2x2 grid with enhanced styling
-    col1, col2 = st.columns(2)
-    
-    for i, feature in enumerate(features):
-        with col1 if i % 2 == 0 else col2:
-            with st.container():
-                st.markdown(f"""
-                <div class="node-card">
-                    <div class="feature-icon">{feature['icon']}</div>
-                    <h3>{feature['title']}</h3>
-                    <p>{feature['description']}</p>
-                </div>
-                """, unsafe_allow_html=True)
+    # Display features in a 2x2 CSS grid with enhanced styling, in a single markdown call
+    # Cards stay on one line each: a blank line inside the grid would end the markdown HTML block
+    features_html = "".join(
+        f"<div class='node-card'><div class='feature-icon'>{feature['icon']}</div>"
+        f"<h3>{feature['title']}</h3><p>{feature['description']}</p></div>"
+        for feature in features
+    )
+    st.markdown(f"<div class='feature-grid'>{features_html}</div>", unsafe_allow_html=True)
     
     # How it works section with step-by-step visualization
     st.markdown("<h2 class='section-header'>🧩 How NodeLearn Works</h2>", unsafe_allow_html=True)
@@ -403,18 +413,18 @@ def show_landing(authenticated=False):
         }
     ]
     
-    for i, step in enumerate(steps):
-        st.markdown(f"""
-        <div class="step-container">
-            <div style="display: flex; align-items: center;">
-                <span class="step-number">{i+1}</span>
-                <div>
-                    <h3 style="color: #e1bee7; margin-bottom: 0.5rem;">{step['title']}</h3>
-                    <p style="color: #d1c4e9; font-size: 1.05rem;">{step['description']}</p>
-                </div>
+    # All steps go out in a single markdown call
+    st.markdown("".join(f"""
+    <div class="step-container">
+        <div style="display: flex; align-items: center;">
+            <span class="step-number">{i+1}</span>
+            <div>
+                <h3 style="color: #e1bee7; margin-bottom: 0.5rem;">{step['title']}</h3>
+                <p style="color: #d1c4e9; font-size: 1.05rem;">{step['description']}</p>
             </div>
         </div>
-        """, unsafe_allow_html=True)
+    </div>
+    """ for i, step in enumerate(steps)), unsafe_allow_html=True)
     
     # Testimonial section (adds social proof)
     if not authenticated:
@@ -442,10 +452,9 @@ def show_landing(authenticated=False):
             </div>
             """, unsafe_allow_html=True)
     
-    # Technologies section with badges
-    st.markdown("<h2 class='section-header'>🛠️ Built With Cutting-Edge Tech</h2>", unsafe_allow_html=True)
-    
+    # Technologies section with badges, plus the call to action heading
     st.markdown("""
+    <h2 class='section-header'>🛠️ Built With Cutting-Edge Tech</h2>
     <div style="text-align: center; margin: 2rem 0; animation: fadeIn 1.8s ease-out;">
         <span class="tech-badge">🐍 Python</span>
         <span class="tech-badge">🖥️ Streamlit</span>
@@ -454,20 +463,15 @@ def show_landing(authenticated=False):
         <span class="tech-badge">📊 NetworkX</span>
         <span class="tech-badge">🔄 Plotly</span>
     </div>
-    """, unsafe_allow_html=True)
     
-    # Call to action section
-    st.markdown("<h2 class='section-header'>🚀 Ready to Transform Your Learning?</h2>", unsafe_allow_html=True)
+    <h2 class='section-header'>🚀 Ready to Transform Your Learning?</h2>
+    """, unsafe_allow_html=True)
     
     # Different CTA based on authentication status
     if not authenticated:
-        if st.button("Get Started Now", key="cta_button", use_container_width=True):
-                st.session_state.current_page = 'signup'
-                st.rerun()
+        st.button("Get Started Now", key="cta_button", on_click=_navigate, args=('signup',), use_container_width=True)
     else:
-        if st.button("Continue Your Learning Journey", key="continue_journey", use_container_width=True):
-                st.session_state.current_page = 'visualizer'
-                st.rerun()
+        st.button("Continue Your Learning Journey", key="continue_journey", on_click=_navigate, args=('visualizer',), use_container_width=True)
     
     # Footer section
     st.markdown("""
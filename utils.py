@@ -1,11 +1,21 @@
 import re
+import mmap
 import string
-import json
 import networkx as nx
-import base64
 import datetime
 import streamlit as st
-import base64
+
+# pybase64 wraps SIMD base64 kernels and can encode straight to str
+try:
+    from pybase64 import b64encode_as_string
+except ImportError:
+    import base64
+
+    def b64encode_as_string(data):
+        return base64.b64encode(data).decode("ascii")
+
+# orjson is in requirements.txt; called by name so it never stands in for the stdlib json API
+import orjson
 
 def init_session_state():
     """Initialize session state variables"""
@@ -18,12 +28,20 @@ def init_session_state():
     if "user_name" not in st.session_state:
         st.session_state.user_name = None
 
+@st.cache_data(show_spinner=False)
 def get_base64_image(image_path):
-    with open(image_path, "rb") as img_file:
-        encoded = base64.b64encode(img_file.read()).decode()
+    """Encode an image as a data URI, once per path rather than on every rerun"""
+    # Map the file rather than reading it into a separate bytes buffer
+    with open(image_path, "rb") as img_file, mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        encoded = b64encode_as_string(data)
     return f"data:image/png;base64,{encoded}"
 
 
+# Built once: punctuation (except hyphens) to delete, runs of whitespace, and words
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation.replace('-', ''))
+_WS_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\S+')
+
 def clean_text(text):
     """Clean and normalize text for better processing"""
     if not text:
@@ -33,17 +51,16 @@ def clean_text(text):
     text = text.lower()
     
     # Remove punctuation except hyphens
-    exclude = set(string.punctuation.replace('-', ''))
-    text = ''.join(ch for ch in text if ch not in exclude)
+    text = text.translate(_PUNCT_TABLE)
     
     # Replace multiple spaces with single space
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     return text.strip()
 
 def format_topic(topic):
     """Format topic string for display (capitalize words)"""
-    return ' '.join(word.capitalize() for word in topic.split())
+    return string.capwords(topic)
 
 def truncate_text(text, max_length=100):
     """Truncate text to maximum length with ellipsis"""
@@ -54,47 +71,59 @@ def truncate_text(text, max_length=100):
 def safe_json_loads(json_str):
     """Safely load JSON with error handling"""
     try:
-        return json.loads(json_str)
+        return orjson.loads(json_str)
     except Exception as e:
         st.error(f"Error parsing JSON: {e}")
         return {}
 
 def networkx_to_nodes_edges(graph):
     """Convert NetworkX graph to nodes and edges dictionaries for DB storage"""
-    nodes = {}
-    edges = {}
+    # Node attribute dicts are referenced, not copied; they are only read for serialization
+    nodes = dict(graph.nodes(data=True))
     
-    # Convert nodes
-    for node in graph.nodes():
-        nodes[node] = dict(graph.nodes[node])
-    
-    # Convert edges
-    for edge in graph.edges():
-        edge_key = f"{edge[0]}_{edge[1]}"
-        edges[edge_key] = dict(graph.edges[edge])
+    # Convert edges; endpoints are stored explicitly since node ids may contain any delimiter
+    edges = {
+        str(i): {"source": source, "target": target, **attrs}
+        for i, (source, target, attrs) in enumerate(graph.edges(data=True))
+    }
     
     return nodes, edges
 
+def _edge_tuple(edge_key, edge_attrs, nodes):
+    """(source, target, attrs) for a stored edge, or None when its endpoints can't be resolved"""
+    if "source" in edge_attrs and "target" in edge_attrs:
+        attrs = dict(edge_attrs)
+        return attrs.pop("source"), attrs.pop("target"), attrs
+    # Older trees keyed edges as source_target; node names may contain underscores
+    # themselves, so take the split whose halves are both stored nodes
+    for i, char in enumerate(edge_key):
+        if char == '_' and edge_key[:i] in nodes and edge_key[i + 1:] in nodes:
+            return edge_key[:i], edge_key[i + 1:], edge_attrs
+    return None
+
 def nodes_edges_to_networkx(nodes, edges):
     """Convert nodes and edges dictionaries to NetworkX graph"""
     G = nx.Graph()
     
-    # Add nodes
-    for node_id, node_attrs in nodes.items():
-        G.add_node(node_id, **node_attrs)
-    
-    # Add edges
-    for edge_key, edge_attrs in edges.items():
-        source, target = edge_key.split('_')
-        G.add_edge(source, target, **edge_attrs)
+    # Add nodes and edges in bulk rather than one call per item; unresolvable
+    # legacy edges are skipped rather than inventing nodes for them
+    G.add_nodes_from(nodes.items())
+    edge_tuples = (_edge_tuple(edge_key, edge_attrs, nodes) for edge_key, edge_attrs in edges.items())
+    G.add_edges_from(edge for edge in edge_tuples if edge is not None)
     
     return G
 
 def estimate_reading_time(text, words_per_minute=200):
     """Estimate reading time in minutes based on word count"""
-    word_count = len(text.split())
+    word_count = sum(1 for _ in _WORD_RE.finditer(text))
     minutes = word_count / words_per_minute
     return max(1, round(minutes))
 
+# Display format shared by session timestamps
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
 def format_datetime(dt):
-    """Format datetime for display"""
\ No newline at end of file
+    """Format datetime for display"""
+    if not isinstance(dt, datetime.datetime):
+        return str(dt) if dt else ""
+    return dt.strftime(DATETIME_FORMAT)
@@ -1,13 +1,208 @@
 import streamlit as st
 import networkx as nx
+import numpy as np
 import plotly.graph_objects as go
-import json
+import os
+import orjson
+import math
+import re
 import time
-import uuid
-from pyvis.network import Network
+import atexit
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import streamlit.components.v1 as components
-from db import get_db_connection
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from db import get_db_connection, field_path_safe
 from ai_explainer import AIExplorer
+from utils import networkx_to_nodes_edges, nodes_edges_to_networkx
+
+def _topic_data_key(topic_data):
+    """Canonical bytes for topic data, compared to decide whether the graph needs a rebuild"""
+    return orjson.dumps(topic_data, option=orjson.OPT_SORT_KEYS)
+
+# Hosts the PyVis page and reports node clicks and double-clicks back as its value
+_node_picker = components.declare_component(
+    "node_picker",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "components", "node_picker")
+)
+
+# Node count above which Plotly layouts switch from spring to shell positioning
+LARGE_GRAPH_NODES = 80
+
+# Node count above which the Plotly graph is drawn with WebGL instead of SVG
+WEBGL_GRAPH_NODES = 200
+
+# Node count above which PyVis only draws the neighbourhood of the current node
+LOD_GRAPH_NODES = 500
+
+# Node count above which live physics starts without vis.js's up-front stabilization run
+STABILIZE_GRAPH_NODES = 300
+
+# Pixels per layout unit when passing NetworkX positions to PyVis
+PYVIS_LAYOUT_SCALE = 1000
+
+# Auto-expansion checks its queue this often, fetches up to this many nodes at once per check,
+# and redraws the graph after this many expansions
+AUTO_EXPAND_INTERVAL_SECONDS = 2
+AUTO_EXPAND_BATCH = 3
+AUTO_EXPAND_REDRAW_EVERY = 5
+
+# Seconds the tree writer waits after a save request so a burst of expansions becomes one write,
+# and how many times it tries one tree's additions, waiting twice as long after each failure
+SAVE_DEBOUNCE_SECONDS = 2
+SAVE_MAX_ATTEMPTS = 5
+
+# The writer thread has no page to report on, so its failures go to the log
+logger = logging.getLogger(__name__)
+
+# Nodes and edges waiting for the writer thread, accumulated per stored tree id
+_pending_saves = {}
+_save_failures = {}  # Tree id -> consecutive failed writes, guarded by the same lock
+_pending_saves_lock = threading.Lock()
+_save_requested = threading.Event()
+
+def _queue_tree_save(tree_id, new_nodes, new_edges):
+    """Hand a tree's additions to the background writer instead of saving them inline"""
+    with _pending_saves_lock:
+        nodes, edges = _pending_saves.setdefault(tree_id, ({}, {}))
+        nodes.update(new_nodes)
+        edges.update(new_edges)
+    _save_requested.set()
+
+def _flush_tree_saves():
+    """Write every pending addition, all trees in one bulk write, re-queueing the trees that failed"""
+    with _pending_saves_lock:
+        pending = dict(_pending_saves)
+        _pending_saves.clear()
+    if not pending:
+        return
+    try:
+        failed = get_db_connection().add_to_knowledge_trees(pending)
+    except Exception as e:
+        logger.error("Tree writer failed: %s", e)
+        failed = set(pending)
+    
+    # Put failed trees back under anything queued for them meanwhile; the $set updates are
+    # idempotent, so rewriting what did land is harmless. A tree that keeps failing is dropped
+    with _pending_saves_lock:
+        for tree_id in pending.keys() - failed:
+            _save_failures.pop(tree_id, None)
+        for tree_id in failed:
+            _save_failures[tree_id] = _save_failures.get(tree_id, 0) + 1
+            if _save_failures[tree_id] >= SAVE_MAX_ATTEMPTS:
+                logger.error("Dropping unsaved additions to tree %s after %d failed writes", tree_id, _save_failures.pop(tree_id))
+                continue
+            nodes, edges = pending[tree_id]
+            newer_nodes, newer_edges = _pending_saves.get(tree_id, ({}, {}))
+            nodes.update(newer_nodes)
+            edges.update(newer_edges)
+            _pending_saves[tree_id] = (nodes, edges)
+        retry = bool(_save_failures)
+    if retry:
+        _save_requested.set()
+
+def _save_expansion(nodes_before, edges_before, deferred=False):
+    """Store the nodes and edges added since the stored dicts had the given sizes, in the background if deferred"""
+    if not st.session_state.authenticated:
+        return
+    
+    # Both dicts only grow, in insertion order, so the additions are their tails
+    new_nodes = dict(islice(st.session_state.graph_nodes.items(), nodes_before, None))
+    new_edges = dict(islice(st.session_state.graph_edges.items(), edges_before, None))
+    tree_id = st.session_state.tree_id
+    if tree_id and deferred and field_path_safe(new_nodes):
+        # Coalesced with the other additions of the next debounce window
+        _queue_tree_save(tree_id, new_nodes, new_edges)
+        return
+    db = get_db_connection()
+    if tree_id:
+        # Additions that can't be addressed as field paths rewrite this tree's graph whole;
+        # a (user, topic) upsert could land on another tree for the same topic
+        if not db.add_to_knowledge_tree(tree_id, new_nodes, new_edges):
+            db.replace_knowledge_tree_graph(tree_id, st.session_state.graph_nodes, st.session_state.graph_edges)
+        return
+    
+    # No stored tree yet: write it whole
+    db.save_knowledge_tree(
+        st.session_state.user_id,
+        st.session_state.topic,
+        st.session_state.graph_nodes,
+        st.session_state.graph_edges,
+        update=True
+    )
+
+def _tree_save_worker():
+    while True:
+        _save_requested.wait()
+        with _pending_saves_lock:
+            failures = max(_save_failures.values(), default=0)
+        time.sleep(SAVE_DEBOUNCE_SECONDS * 2 ** failures)
+        _save_requested.clear()
+        _flush_tree_saves()
+
+threading.Thread(target=_tree_save_worker, name="tree-save-worker", daemon=True).start()
+atexit.register(_flush_tree_saves)
+
+@st.cache_resource(show_spinner=False)
+def get_explorer(provider):
+    """One AIExplorer per provider, reused across reruns instead of rebuilt per click"""
+    return AIExplorer(provider=provider)
+
+# The sidebar reruns with every click; reuse the recent topics list instead of querying each time
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_recent_trees(user_id):
+    return get_db_connection().get_knowledge_tree(user_id, projection={"topic": 1}, limit=5)
+
+# LLM answers for the same request don't change meaningfully within a day; failed calls are not kept
+@st.cache_data(ttl=86400, show_spinner=False)
+def _cached_explore_topic(provider, topic, depth):
+    return get_explorer(provider).explore_topic(topic, depth=depth)
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _cached_detailed_explanation(provider, topic):
+    return get_explorer(provider).get_detailed_explanation(topic)
+
+def _explore_topic(provider, topic, depth):
+    """Topic exploration, reusing a cached answer for repeat requests"""
+    topic_data = _cached_explore_topic(provider, topic, depth)
+    if not topic_data.get("related_concepts") and not topic_data.get("subtopics"):
+        _cached_explore_topic.clear(provider, topic, depth)
+    return topic_data
+
+def _detailed_explanation(provider, topic):
+    """Detailed explanation, reusing a cached answer for repeat requests"""
+    explanation = _cached_detailed_explanation(provider, topic)
+    if explanation.startswith("Failed to get explanation"):
+        _cached_detailed_explanation.clear(provider, topic)
+    return explanation
+
+def _load_recent_tree(topics):
+    """Selectbox callback: queue the picked tree for loading, then clear the pick"""
+    tree_id = st.session_state.recent_topic_pick
+    if tree_id:
+        st.session_state.load_tree_id = tree_id
+        st.session_state.load_topic = topics[tree_id]
+    st.session_state.recent_topic_pick = None
+
+# Node ids are a per-session counter in hex, e.g. "n1f"
+_NODE_ID_RE = re.compile(r"n([0-9a-f]+)")
+
+def _new_node_id():
+    """Next node id for this session; ids only need to be unique within a tree"""
+    st.session_state.next_node_id = st.session_state.get("next_node_id", 0) + 1
+    return f"n{st.session_state.next_node_id:x}"
+
+def _continue_node_ids(G):
+    """Move the id counter past the ids of a loaded tree; older trees hold uuids, which never match"""
+    counters = [
+        int(match.group(1), 16)
+        for match in (_NODE_ID_RE.fullmatch(attrs.get("node_id", "")) for _, attrs in G.nodes(data=True))
+        if match
+    ]
+    st.session_state.next_node_id = max([st.session_state.get("next_node_id", 0), *counters])
 
 def create_knowledge_graph(topic_data):
     """Create a NetworkX graph from topic data"""
@@ -16,28 +211,28 @@ def create_knowledge_graph(topic_data):
     # Add main topic node
     main_topic = topic_data["topic"]
     G.add_node(main_topic, size=25, color="#6200EA", title=topic_data["summary"], 
-               type="main", level=0, node_id=str(uuid.uuid4()))
-    
-    # Add related concepts
-    for concept in topic_data.get("related_concepts", []):
-        concept_name = concept["name"]
-        node_id = str(uuid.uuid4())
-        G.add_node(concept_name, size=15, color="#7C4DFF", title=concept["summary"], 
-                   type="concept", level=1, parent=main_topic, node_id=node_id)
-        G.add_edge(main_topic, concept_name, title=concept["relation"], weight=1)
-    
-    # Add subtopics if they exist
-    for subtopic in topic_data.get("subtopics", []):
-        subtopic_name = subtopic["name"]
-        node_id = str(uuid.uuid4())
-        G.add_node(subtopic_name, size=20, color="#3949AB", title=subtopic["summary"], 
-                   type="subtopic", level=1, parent=main_topic, node_id=node_id)
-        G.add_edge(main_topic, subtopic_name, title="subtopic", weight=1)
+               type="main", level=0, node_id=_new_node_id())
+    
+    # Add related concepts and subtopics in bulk, one edge from the main topic to each
+    concepts = topic_data.get("related_concepts", [])
+    subtopics = topic_data.get("subtopics", [])
+    G.add_nodes_from(
+        (concept["name"], {"size": 15, "color": "#7C4DFF", "title": concept["summary"],
+                           "type": "concept", "level": 1, "parent": main_topic, "node_id": _new_node_id()})
+        for concept in concepts
+    )
+    G.add_nodes_from(
+        (subtopic["name"], {"size": 20, "color": "#3949AB", "title": subtopic["summary"],
+                            "type": "subtopic", "level": 1, "parent": main_topic, "node_id": _new_node_id()})
+        for subtopic in subtopics
+    )
+    G.add_edges_from((main_topic, concept["name"], {"title": concept["relation"], "weight": 1}) for concept in concepts)
+    G.add_edges_from((main_topic, subtopic["name"], {"title": "subtopic", "weight": 1}) for subtopic in subtopics)
     
     return G
 
-def add_subnodes_to_graph(G, node_name, subnodes_data):
-    """Add subnodes to the graph for a selected node"""
+def add_subnodes_to_graph(G, node_name, subnodes_data, nodes_dict=None, edges_dict=None):
+    """Add subnodes to the graph for a selected node, recording them in the DB dicts when given"""
     # Get the node's level
     parent_level = G.nodes[node_name].get('level', 0)
     parent_id = G.nodes[node_name].get('node_id')
@@ -45,10 +240,11 @@ def add_subnodes_to_graph(G, node_name, subnodes_data):
     # Add subnodes
     for subnode in subnodes_data.get('related_concepts', []):
         subnode_name = subnode["name"]
-        node_id = str(uuid.uuid4())
         
         # Check if node already exists
         if subnode_name not in G:
+            node_id = _new_node_id()
+            
             # Create a new node with a different color based on level
             colors = ["#E91E63", "#00BCD4", "#FF9800", "#4CAF50", "#9C27B0"]
             level_color = colors[min((parent_level + 1) % len(colors), len(colors) - 1)]
@@ -70,133 +266,244 @@ def add_subnodes_to_graph(G, node_name, subnodes_data):
                 title=subnode.get("relation", "related to"), 
                 weight=1
             )
+            
+            # Keep the stored form in step, in the layout networkx_to_nodes_edges produces
+            if nodes_dict is not None:
+                nodes_dict[subnode_name] = G.nodes[subnode_name]
+            if edges_dict is not None:
+                edges_dict[str(len(edges_dict))] = {"source": node_name, "target": subnode_name,
+                                                    **G.edges[node_name, subnode_name]}
     
     return G
 
-def convert_to_pyvis(nx_graph, click_callback=True):
+# Posts node clicks and double-clicks from the PyVis page to the node_picker component hosting it
+NODE_EVENTS_JS = """
+<script>
+// Wait for network to be fully loaded
+setTimeout(function() {
+    try {
+        // PyVis keeps the network instance in a page-level variable
+        
+        // Add click event listener
+        network.on("click", function(params) {
+            if (params.nodes.length > 0) {
+                var nodeId = params.nodes[0];
+                var node = network.body.data.nodes.get(nodeId);
+                
+                // Visual feedback for node selection
+                network.body.data.nodes.update({
+                    id: nodeId,
+                    borderWidth: 3,
+                    borderColor: "#FF5722"
+                });
+                
+                // Send node info to the node_picker component hosting this page
+                window.parent.postMessage({nodePicker: {
+                    action: "select",
+                    id: nodeId,
+                    label: node.label,
+                    node_id: node.node_id,
+                    type: node.node_type,
+                    level: node.level
+                }}, "*");
+            }
+        });
+        
+        // Add double-click event for quick expansion
+        network.on("doubleClick", function(params) {
+            if (params.nodes.length > 0) {
+                var nodeId = params.nodes[0];
+                var node = network.body.data.nodes.get(nodeId);
+                
+                // Send node info with expansion flag
+                window.parent.postMessage({nodePicker: {
+                    action: "expand",
+                    id: nodeId,
+                    label: node.label,
+                    node_id: node.node_id
+                }}, "*");
+            }
+        });
+    } catch (e) {
+        console.error("Error setting up node click handler:", e);
+    }
+}, 1000);
+</script>
+"""
+
+# vis.js options shared by every PyVis graph
+PYVIS_OPTIONS = {
+    "nodes": {
+        "font": {
+            "size": 12,
+            "face": "Roboto"
+        },
+        "borderWidth": 2,
+        "shadow": True
+    },
+    "edges": {
+        "color": {
+            "inherit": True
+        },
+        "smooth": {
+            "type": "continuous",
+            "forceDirection": "none"
+        },
+        "shadow": True,
+        "width": 1.5
+    },
+    "interaction": {
+        "hover": True,
+        "navigationButtons": True,
+        "keyboard": True,
+        "tooltipDelay": 300,
+        "selectConnectedEdges": True,
+        "hoverConnectedEdges": True
+    },
+    # Live simulation is opt-in per call; a running Barnes-Hut solver pins the browser on large graphs
+    "physics": {
+        "enabled": False,
+        "solver": "barnesHut",
+        "barnesHut": {
+            "gravitationalConstant": -8000,  # More negative value for more repulsion
+            "centralGravity": 0.8,           # Higher value to keep nodes more centered
+            "springLength": 200,             # More space between nodes
+            "springConstant": 0.05,          # Weaker spring for more flexibility
+            "damping": 0.9,                  # Less oscillation
+            "avoidOverlap": 0                # Prevent node overlap
+        },
+        "stabilization": {
+            "iterations": 100
+        }
+    },
+    "manipulation": {
+        "enabled": False
+    }
+}
+
+def convert_to_pyvis(nx_graph, click_callback=True, physics=False):
     """Convert NetworkX graph to PyVis for HTML visualization with click events"""
+    return _pyvis_network(*_graph_signature(nx_graph), physics=physics)
+
+def _pyvis_network(nodes, edges, physics=False):
+    """PyVis network for a graph signature, read straight from its tuples"""
+    # PyVis pulls in jinja2 and its templates; only pay for that once a graph is drawn
+    from pyvis.network import Network
+    
     pyvis_net = Network(height="600px", width="100%", bgcolor="#FFFFFF", font_color="black", select_menu=True, cdn_resources="remote")
     
-    # Configure physics for better visualization
-    pyvis_net.barnes_hut(
-        gravity=-8000,        # More negative value for more repulsion
-        central_gravity=0.8,  # Higher value to keep nodes more centered
-        spring_length=200,    # More space between nodes
-        spring_strength=0.05, # Weaker spring for more flexibility
-        damping=0.9,          # Less oscillation
-        overlap=0            # Prevent node overlap
-    )
+    # Precomputed positions let the browser draw immediately instead of running its own layout
+    pos = _layout_positions(tuple(node[0] for node in nodes), tuple(edge[:2] for edge in edges))
     
-    # Add nodes and edges from NetworkX
-    for node in nx_graph.nodes():
-        node_attrs = nx_graph.nodes[node]
+    # Add nodes and edges
+    for node, title, size, color, level, node_type, node_id in nodes:
+        x, y = pos[node]
         pyvis_net.add_node(
             node, 
             label=node, 
-            title=node_attrs.get("title", ""),
-            size=node_attrs.get("size", 15),
-            color=node_attrs.get("color", "#7C4DFF"),
+            x=x * PYVIS_LAYOUT_SCALE,
+            y=y * PYVIS_LAYOUT_SCALE,
+            title=title,
+            size=size,
+            color=color,
             # Store additional attributes for access in JS events
-            level=node_attrs.get("level", 0),
-            node_type=node_attrs.get("type", "concept"),
-            node_id=node_attrs.get("node_id", "")
+            level=level,
+            node_type=node_type,
+            node_id=node_id
         )
     
-    for edge in nx_graph.edges():
-        edge_attrs = nx_graph.edges[edge]
-        weight = edge_attrs.get("weight", 1)
+    for source, target, title, weight in edges:
         pyvis_net.add_edge(
-            edge[0], 
-            edge[1],
-            title=edge_attrs.get("title", ""),
+            source, 
+            target,
+            id=f"{source}\t{target}",  # Stable id so the browser can update edges in place
+            title=title,
             value=weight,  # Edge thickness
             arrowStrikethrough=False
         )
     
-    # Create options dictionary
-    options = {
-        "nodes": {
-            "font": {
-                "size": 12,
-                "face": "Roboto"
-            },
-            "borderWidth": 2,
-            "shadow": True
-        },
-        "edges": {
-            "color": {
-                "inherit": True
-            },
-            "smooth": {
-                "type": "continuous",
-                "forceDirection": "none"
-            },
-            "shadow": True,
-            "width": 1.5
-        },
-        "interaction": {
-            "hover": True,
-            "navigationButtons": True,
-            "keyboard": True,
-            "tooltipDelay": 300,
-            "selectConnectedEdges": True,
-            "hoverConnectedEdges": True
-        },
-        "physics": {
-            "stabilization": {
-                "iterations": 100
-            }
-        },
-        "manipulation": {
-            "enabled": False
-        }
-    }
-    
-    # Set options
-    pyvis_net.options = options
+    # Set options; PyVis serializes the dict itself, so only the physics section is built per call
+    physics_options = {**PYVIS_OPTIONS["physics"], "enabled": physics}
+    if len(nodes) > STABILIZE_GRAPH_NODES:
+        # Nodes start at precomputed positions, so skip the blocking warm-up and let a live simulation settle on screen
+        physics_options["stabilization"] = {"enabled": False}
+    pyvis_net.options = {**PYVIS_OPTIONS, "physics": physics_options}
     
     return pyvis_net
 
-def create_plotly_graph(nx_graph):
-    """Create a Plotly visualization of the graph"""
-    # Create positions for nodes using a spring layout
-    pos = nx.spring_layout(nx_graph, seed=42)
+def _graph_signature(nx_graph):
+    """Hashable snapshot of the attributes the PyVis view renders, used as its cache key"""
+    nodes = tuple(
+        (node, attrs.get("title", ""), attrs.get("size", 15), attrs.get("color", "#7C4DFF"),
+         attrs.get("level", 0), attrs.get("type", "concept"), attrs.get("node_id", ""))
+        for node, attrs in nx_graph.nodes(data=True)
+    )
+    edges = tuple(
+        (source, target, attrs.get("title", ""), attrs.get("weight", 1))
+        for source, target, attrs in nx_graph.edges(data=True)
+    )
+    return nodes, edges
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def render_pyvis_html(nodes, edges, physics=False):
+    """PyVis HTML plus its vis.js node and edge lists for a graph signature, rebuilt only when the graph changes"""
+    pyvis_net = _pyvis_network(nodes, edges, physics=physics)
+    html_data = pyvis_net.generate_html(notebook=False)
+    # Insert the node click script before the closing body tag
+    return html_data.replace('</body>', NODE_EVENTS_JS + '</body>', 1), pyvis_net.nodes, pyvis_net.edges
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _layout_positions(nodes, edges):
+    """Node positions for a graph structure, computed once per structure"""
+    G = nx.Graph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+    
+    # A short seeded spring layout for small graphs; large ones use Graphviz's multilevel
+    # sfdp when pygraphviz and the sfdp program work, else the linear-time shell layout
+    if len(G) > LARGE_GRAPH_NODES:
+        try:
+            pos = nx.rescale_layout_dict(nx.nx_agraph.graphviz_layout(G, prog="sfdp"))
+        except (ImportError, OSError, ValueError):
+            pos = nx.shell_layout(G)
+    else:
+        pos = nx.spring_layout(G, k=1 / math.sqrt(max(len(G), 1)), iterations=15, seed=42)
+    return {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+
+def create_plotly_graph(nx_graph, pos=None):
+    """Create a Plotly visualization of the graph, optionally at precomputed positions"""
+    # Create positions for nodes, reusing the cached layout while the structure is unchanged
+    if pos is None:
+        pos = _layout_positions(tuple(nx_graph.nodes()), tuple(nx_graph.edges()))
+    
+    # Exactly one edge trace and one node trace; WebGL keeps large graphs responsive
+    scatter = go.Scattergl if len(nx_graph) > WEBGL_GRAPH_NODES else go.Scatter
     
     # Create edges
-    edge_x = []
-    edge_y = []
-    edge_text = []
-    
-    for edge in nx_graph.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-        edge_text.append(nx_graph.edges[edge].get("title", ""))
-    
-    edge_trace = go.Scatter(
+    # Gather both endpoints per edge from one coordinate array; NaN rows break the line between edges
+    nodes = list(nx_graph.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    coords = np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+    edge_index = np.array([(index[u], index[v]) for u, v in nx_graph.edges()], dtype=np.intp).reshape(-1, 2)
+    segments = np.full((len(edge_index), 3, 2), np.nan)
+    segments[:, 0] = coords[edge_index[:, 0]]
+    segments[:, 1] = coords[edge_index[:, 1]]
+    edge_x, edge_y = segments.reshape(-1, 2).T
+    
+    edge_trace = scatter(
         x=edge_x, y=edge_y,
         line=dict(width=1, color='#888'),
         hoverinfo='none',
         mode='lines')
     
     # Create nodes
-    node_x = []
-    node_y = []
-    node_text = []
-    node_size = []
-    node_color = []
+    node_attrs = nx_graph.nodes(data=True)
+    node_text = [f"{node}<br>{attrs.get('title', '')}" for node, attrs in node_attrs]
+    node_size = np.fromiter((attrs.get("size", 15) for _, attrs in node_attrs), dtype=float, count=len(nx_graph))
+    node_color = [attrs.get("color", "#7C4DFF") for _, attrs in node_attrs]
     
-    for node in nx_graph.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(f"{node}<br>{nx_graph.nodes[node].get('title', '')}")
-        node_size.append(nx_graph.nodes[node].get("size", 15))
-        node_color.append(nx_graph.nodes[node].get("color", "#7C4DFF"))
-    
-    node_trace = go.Scatter(
-        x=node_x, y=node_y,
+    node_trace = scatter(
+        x=coords[:, 0], y=coords[:, 1],
         mode='markers',
         hoverinfo='text',
         text=node_text,
@@ -220,6 +527,152 @@ def create_plotly_graph(nx_graph):
     
     return fig
 
+@st.fragment
+def _node_details_fragment(ai_provider):
+    """Node details panel, isolated so explanation requests rerun only this section"""
+    if st.session_state.graph and st.session_state.current_node:
+        current_node = st.session_state.current_node
+        
+        if current_node in st.session_state.graph.nodes():
+            node_attrs = st.session_state.graph.nodes[current_node]
+            
+            # Display node information with enhanced UI
+            with st.expander(f"📖 {current_node}", expanded=True):
+                st.markdown(node_attrs.get('title', 'No description available'))
+                
+                # Node metadata with better layout
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.markdown(f"**Type:** {node_attrs.get('type', 'concept').title()}")
+                with col2:
+                    level = node_attrs.get('level', 0)
+                    st.markdown(f"**Depth Level:** {level}")
+                with col3:
+                    if node_attrs.get('parent'):
+                        parent = node_attrs.get('parent')
+                        st.markdown(f"**Parent:** {parent}")
+                
+                # More visible expansion controls
+                btn_col1, btn_col2 = st.columns(2)
+                with btn_col1:
+                    if current_node not in st.session_state.subnodes_expanded:
+                        expand_btn = st.button("🌱 Expand this concept", 
+                                    key=f"expand_{current_node}",
+                                    type="primary",
+                                    use_container_width=True)
+                    else:
+                        expand_btn = st.button("✓ Already expanded", 
+                                    key=f"expand_{current_node}",
+                                    disabled=True,
+                                    use_container_width=True)
+                        
+                    if expand_btn and current_node not in st.session_state.subnodes_expanded:
+                        with st.spinner(f"Expanding {current_node}..."):
+                            # Initialize AI explorer
+                            explorer = get_explorer("google" if ai_provider == "Google Generative AI" else "groq")
+                            
+                            # Get subnodes for this concept
+                            subnodes_data = explorer.explore_subtopic(
+                                main_topic=st.session_state.topic,
+                                subtopic=current_node
+                            )
+                            
+                            # Update graph with new subnodes, noting where the stored dicts end now
+                            nodes_before, edges_before = len(st.session_state.graph_nodes), len(st.session_state.graph_edges)
+                            st.session_state.graph = add_subnodes_to_graph(
+                                st.session_state.graph, 
+                                current_node, 
+                                subnodes_data,
+                                st.session_state.graph_nodes,
+                                st.session_state.graph_edges
+                            )
+                            
+                            # Mark node as expanded
+                            st.session_state.subnodes_expanded.add(current_node)
+                            
+                            # Update nodes explored count
+                            st.session_state.nodes_explored.add(current_node)
+                            
+                            # Save the additions; a burst of expansions reaches MongoDB as one write
+                            _save_expansion(nodes_before, edges_before, deferred=True)
+                        
+                        # The graph above must redraw with the new nodes, so rerun the whole page
+                        st.rerun(scope="app")
+                
+                # Detailed explanation
+                if st.button("📚 Get detailed explanation", key=f"explain_{current_node}"):
+                    with st.spinner(f"Generating detailed explanation..."):
+                        explanation = _detailed_explanation(
+                            "google" if ai_provider == "Google Generative AI" else "groq",
+                            current_node
+                        )
+                        st.markdown("### Detailed Explanation")
+                        st.markdown(explanation)
+
+@st.fragment(run_every=AUTO_EXPAND_INTERVAL_SECONDS)
+def _auto_expand_fragment(ai_provider):
+    """Expand a few queued nodes per tick without rerunning the whole page for each"""
+    if not st.session_state.graph:
+        return
+    
+    # Get the next nodes to expand, skipping ones that are gone or already expanded
+    nodes_to_expand = []
+    while st.session_state.expansion_queue and len(nodes_to_expand) < AUTO_EXPAND_BATCH:
+        candidate = st.session_state.expansion_queue.popleft()
+        st.session_state.expansion_queued.discard(candidate)
+        if (candidate in st.session_state.graph.nodes() and 
+            candidate not in st.session_state.subnodes_expanded):
+            nodes_to_expand.append(candidate)
+    if not nodes_to_expand:
+        return
+    
+    expanded_before = len(st.session_state.subnodes_expanded)
+    with st.spinner(f"Auto-expanding {', '.join(nodes_to_expand)}..."):
+        # Initialize AI explorer
+        explorer = get_explorer("google" if ai_provider == "Google Generative AI" else "groq")
+        
+        # The LLM calls are independent, so wait for the slowest one rather than their sum;
+        # workers get the script context so explore_subtopic's st.error still reaches the page
+        ctx, main_topic = get_script_run_ctx(), st.session_state.topic
+        with ThreadPoolExecutor(max_workers=len(nodes_to_expand),
+                                initializer=lambda: add_script_run_ctx(ctx=ctx)) as pool:
+            results = list(pool.map(
+                lambda node: explorer.explore_subtopic(main_topic=main_topic, subtopic=node),
+                nodes_to_expand
+            ))
+        
+        # Update graph with new subnodes in queue order, noting where the stored dicts end now
+        nodes_before, edges_before = len(st.session_state.graph_nodes), len(st.session_state.graph_edges)
+        for node_to_expand, subnodes_data in zip(nodes_to_expand, results):
+            st.session_state.graph = add_subnodes_to_graph(
+                st.session_state.graph, 
+                node_to_expand, 
+                subnodes_data,
+                st.session_state.graph_nodes,
+                st.session_state.graph_edges
+            )
+            
+            # Mark node as expanded
+            st.session_state.subnodes_expanded.add(node_to_expand)
+            
+            # Update nodes explored count
+            st.session_state.nodes_explored.add(node_to_expand)
+            
+            # Add new nodes to expansion queue
+            for subnode in subnodes_data.get('related_concepts', []):
+                if subnode["name"] not in st.session_state.expansion_queued:
+                    st.session_state.expansion_queue.append(subnode["name"])
+                    st.session_state.expansion_queued.add(subnode["name"])
+        
+        # Save the additions; the writer thread batches the steps of a run
+        _save_expansion(nodes_before, edges_before, deferred=True)
+    
+    # Redraw the graph every few expansions and when the queue runs dry; otherwise the next tick expands again
+    expanded_after = len(st.session_state.subnodes_expanded)
+    if (expanded_after // AUTO_EXPAND_REDRAW_EVERY > expanded_before // AUTO_EXPAND_REDRAW_EVERY
+            or not st.session_state.expansion_queue):
+        st.rerun(scope="app")
+
 def show_visualizer():
     """Main function to display the knowledge tree visualizer"""
     st.markdown("<h1 class='main-header'>🌳 Infinite Knowledge Tree</h1>", unsafe_allow_html=True)
@@ -231,6 +684,10 @@ def show_visualizer():
         st.session_state.topic_data = None
     if 'graph' not in st.session_state:
         st.session_state.graph = None
+    if 'graph_nodes' not in st.session_state:
+        # The graph as nodes/edges dicts for MongoDB, extended alongside it instead of rebuilt per save
+        st.session_state.graph_nodes = {}
+        st.session_state.graph_edges = {}
     if 'visualization_type' not in st.session_state:
         st.session_state.visualization_type = "interactive"
     if 'exploration_depth' not in st.session_state:
@@ -249,12 +706,20 @@ def show_visualizer():
         st.session_state.load_tree_id = None
     if 'load_topic' not in st.session_state:
         st.session_state.load_topic = None
+    if 'tree_id' not in st.session_state:
+        st.session_state.tree_id = None  # Stored tree for the current topic, once known
     if 'subnodes_expanded' not in st.session_state:
         st.session_state.subnodes_expanded = set()
     if 'auto_expand' not in st.session_state:
         st.session_state.auto_expand = False
     if 'expansion_queue' not in st.session_state:
-        st.session_state.expansion_queue = []
+        # FIFO of nodes to auto-expand, with a set of its contents for constant-time duplicate checks
+        st.session_state.expansion_queue = deque()
+        st.session_state.expansion_queued = set()
+    if 'live_physics' not in st.session_state:
+        st.session_state.live_physics = False
+    if 'lod_radius' not in st.session_state:
+        st.session_state.lod_radius = 2
     
     # Sidebar controls
     with st.sidebar:
@@ -287,21 +752,42 @@ def show_visualizer():
             help="Automatically expand nodes to create an infinite mindmap"
         )
         
+        # Live physics toggle
+        st.session_state.live_physics = st.toggle(
+            "Enable live physics",
+            value=st.session_state.live_physics,
+            help="Keep the graph simulation running in the browser; slow on large graphs"
+        )
+        
+        # Neighbourhood size drawn for large graphs
+        if st.session_state.graph is not None and len(st.session_state.graph) > LOD_GRAPH_NODES:
+            st.session_state.lod_radius = st.slider(
+                "Neighbourhood radius",
+                min_value=1,
+                max_value=5,
+                value=st.session_state.lod_radius,
+                help="Large maps only show concepts within this many steps of the selected one"
+            )
+        
         # History of explored topics
         if st.session_state.authenticated:
             st.divider()
             st.markdown("### 📚 Recent Topics")
-            db = get_db_connection()
-            if db.get_knowledge_tree(st.session_state.user_id):
-                recent_trees = db.get_knowledge_tree(st.session_state.user_id)[:5]
-                
-                for tree in recent_trees:
-                    if st.button(f"📌 {tree.get('topic', 'Untitled')}", key=f"history_{tree.get('_id', '')}"):
-                        st.session_state.load_tree_id = str(tree.get('_id', ''))
-                        st.session_state.load_topic = tree.get('topic', '')
-                        st.rerun()
-            else :
-                pass
+            recent_trees = _cached_recent_trees(st.session_state.user_id)
+            if recent_trees:
+                # One selectbox instead of a button per tree
+                topics = {str(tree["_id"]): tree.get('topic', 'Untitled') for tree in recent_trees}
+                st.selectbox(
+                    "Load a recent topic",
+                    options=list(topics),
+                    format_func=lambda tree_id: f"📌 {topics[tree_id]}",
+                    index=None,
+                    placeholder="Choose a topic",
+                    key="recent_topic_pick",
+                    on_change=_load_recent_tree,
+                    args=(topics,),
+                    label_visibility="collapsed"
+                )
                     
     
     # Check if we should load a tree from history
@@ -313,25 +799,18 @@ def show_visualizer():
             # Set topic
             st.session_state.topic = st.session_state.load_topic
             
-            # Reconstruct knowledge graph from stored data
-            G = nx.Graph()
-            
-            # Add nodes
-            for node_id, node_data in tree.get('nodes', {}).items():
-                G.add_node(
-                    node_id,
-                    **node_data  # Add all stored attributes
-                )
-            
-            # Add edges
-            for edge_key, edge_data in tree.get('edges', {}).items():
-                # Edge key is in format "node1_node2"
-                nodes = edge_key.split('_')
-                if len(nodes) >= 2:  # Make sure we have valid edge data
-                    G.add_edge(nodes[0], nodes[1], **edge_data)
+            # Reconstruct knowledge graph from the stored graph_data
+            graph_data = tree.get('graph_data', {})
+            st.session_state.graph = nodes_edges_to_networkx(
+                graph_data.get('nodes', {}),
+                graph_data.get('edges', {})
+            )
+            st.session_state.graph_nodes, st.session_state.graph_edges = networkx_to_nodes_edges(st.session_state.graph)
+            _continue_node_ids(st.session_state.graph)
             
-            # Store the reconstructed graph
-            st.session_state.graph = G
+            # Remember which stored tree this graph belongs to; it no longer matches any topic_data
+            st.session_state.tree_id = str(tree["_id"])
+            st.session_state.graph_built_from = None
             
             # Set current node to main topic
             st.session_state.current_node = st.session_state.topic
@@ -361,18 +840,24 @@ def show_visualizer():
     if st.button("🔍 Explore Topic", disabled=not st.session_state.topic, key="explore_topic_btn"):
         with st.spinner(f"Exploring {st.session_state.topic}..."):
             # Initialize AI explorer with selected provider
-            explorer = AIExplorer(
-                provider="google" if ai_provider == "Google Generative AI" else "groq"
-            )
-            
             # Get topic data
-            st.session_state.topic_data = explorer.explore_topic(
+            st.session_state.topic_data = _explore_topic(
+                "google" if ai_provider == "Google Generative AI" else "groq",
                 st.session_state.topic,
-                depth=st.session_state.exploration_depth
+                st.session_state.exploration_depth
             )
             
-            # Create graph
-            st.session_state.graph = create_knowledge_graph(st.session_state.topic_data)
+            # Create graph, unless the (cached) exploration returned the data the current graph was built
+            # from and nothing was expanded since; expansions only grow the stored dicts, so their size tells
+            built_from = (hash(_topic_data_key(st.session_state.topic_data)), len(st.session_state.graph_nodes))
+            rebuilt = st.session_state.graph is None or st.session_state.get("graph_built_from") != built_from
+            if rebuilt:
+                st.session_state.graph = create_knowledge_graph(st.session_state.topic_data)
+                st.session_state.graph_nodes, st.session_state.graph_edges = networkx_to_nodes_edges(st.session_state.graph)
+                st.session_state.graph_built_from = (built_from[0], len(st.session_state.graph_nodes))
+                
+                # A new graph has no stored tree until it is saved below
+                st.session_state.tree_id = None
             
             # Set current node to main topic
             st.session_state.current_node = st.session_state.topic
@@ -384,398 +869,117 @@ def show_visualizer():
             st.session_state.exploration_start_time = time.time()
             
             # Initialize expansion queue for auto-expand
-            st.session_state.expansion_queue = [st.session_state.topic]
+            st.session_state.expansion_queue = deque([st.session_state.topic])
+            st.session_state.expansion_queued = {st.session_state.topic}
             
-            # Save to database if authenticated
-            if st.session_state.authenticated:
+            # Save to database if authenticated; an unchanged graph keeps the tree it was stored as
+            if st.session_state.authenticated and not st.session_state.tree_id:
                 db = get_db_connection()
                 
-                # Convert NetworkX graph to node/edge dict for MongoDB
-                nodes_dict = {}
-                edges_dict = {}
-                
-                for node in st.session_state.graph.nodes():
-                    nodes_dict[node] = dict(st.session_state.graph.nodes[node])
-                
-                for edge in st.session_state.graph.edges():
-                    edge_key = f"{edge[0]}_{edge[1]}"
-                    edges_dict[edge_key] = dict(st.session_state.graph.edges[edge])
-                
                 # Save to database
                 tree_id = db.save_knowledge_tree(
                     st.session_state.user_id,
                     st.session_state.topic,
-                    nodes_dict,
-                    edges_dict
+                    st.session_state.graph_nodes,
+                    st.session_state.graph_edges
                 )
-    
-    # Auto-expand logic
-    if st.session_state.auto_expand and st.session_state.graph and st.session_state.expansion_queue:
-        # Get next node to expand
-        node_to_expand = st.session_state.expansion_queue.pop(0)
-        
-        # Check if node exists and hasn't been expanded yet
-        if (node_to_expand in st.session_state.graph.nodes() and 
-            node_to_expand not in st.session_state.subnodes_expanded):
-            
-            with st.spinner(f"Auto-expanding {node_to_expand}..."):
-                # Initialize AI explorer
-                explorer = AIExplorer(
-                    provider="google" if ai_provider == "Google Generative AI" else "groq"
-                )
-                
-                # Get subnodes for this concept
-                subnodes_data = explorer.get_related_concepts(node_to_expand)
-                
-                # Update graph with new subnodes
-                st.session_state.graph = add_subnodes_to_graph(
-                    st.session_state.graph, 
-                    node_to_expand, 
-                    subnodes_data
-                )
-                
-                # Mark node as expanded
-                st.session_state.subnodes_expanded.add(node_to_expand)
-                
-                # Update nodes explored count
-                st.session_state.nodes_explored.add(node_to_expand)
-                
-                # Add new nodes to expansion queue
-                for subnode in subnodes_data:
-                    if subnode["name"] not in st.session_state.expansion_queue:
-                        st.session_state.expansion_queue.append(subnode["name"])
-                
-                # Save updated graph to database
-                if st.session_state.authenticated:
-                    db = get_db_connection()
-                    
-                    # Convert NetworkX graph to node/edge dict for MongoDB
-                    nodes_dict = {}
-                    edges_dict = {}
-                    
-                    for node in st.session_state.graph.nodes():
-                        nodes_dict[node] = dict(st.session_state.graph.nodes[node])
-                    
-                    for edge in st.session_state.graph.edges():
-                        edge_key = f"{edge[0]}_{edge[1]}"
-                        edges_dict[edge_key] = dict(st.session_state.graph.edges[edge])
-                    
-                    # Get existing tree ID or create new
-                    tree = db.get_knowledge_tree(st.session_state.user_id, st.session_state.topic)
-                    tree_id = str(tree[0]["_id"]) if tree and len(tree) > 0 else None
-                    
-                    # Update tree in database
-                    tree_id = db.save_knowledge_tree(
-                        st.session_state.user_id,
-                        st.session_state.topic,
-                        nodes_dict,
-                        edges_dict,
-                        tree_id=tree_id,
-                        update=True
-                    )
-            
-            # Rerun to continue auto-expansion
-            st.rerun()
+                _cached_recent_trees.clear()  # A new tree belongs in the sidebar list
+                st.session_state.tree_id = str(tree_id) if tree_id else None
     
     # Display visualization if graph exists
     if st.session_state.graph:
-        # Interactive visualization with PyVis
-        pyvis_net = convert_to_pyvis(st.session_state.graph)
-        
-        # Save HTML
-        pyvis_net.save_graph("assets/static/temp_graph.html")
+        # Large maps are drawn around the selected node only; the full graph stays in session state
+        view = st.session_state.graph
+        if len(view) > LOD_GRAPH_NODES:
+            center = st.session_state.current_node if st.session_state.current_node in view else st.session_state.topic
+            if center in view:
+                # A subgraph view over the session graph rather than ego_graph's copy
+                view = view.subgraph(nx.single_source_shortest_path_length(view, center, cutoff=st.session_state.lod_radius))
+                st.caption(f"Showing {len(view)} of {len(st.session_state.graph)} concepts within "
+                           f"{st.session_state.lod_radius} steps of {center}")
         
-        # Read the saved HTML
-        with open("assets/static/temp_graph.html", "r", encoding="utf-8") as f:
-            html_data = f.read()
+        # Interactive visualization with PyVis and its click script, generated in memory and cached on the graph's contents
+        html_data, vis_nodes, vis_edges = render_pyvis_html(*_graph_signature(view), physics=st.session_state.live_physics)
         
-        # Add custom JavaScript for node click events with enhanced functionality
-        custom_js = """
-        <script>
-        // Wait for network to be fully loaded
-        setTimeout(function() {
-            try {
-                // Get the network instance
-                const network = document.getElementsByClassName('vis-network')[0].network;
-                
-                // Add click event listener
-                network.on("click", function(params) {
-                    if (params.nodes.length > 0) {
-                        var nodeId = params.nodes[0];
-                        var node = network.body.data.nodes.get(nodeId);
-                        
-                        // Visual feedback for node selection
-                        network.body.data.nodes.update({
-                            id: nodeId,
-                            borderWidth: 3,
-                            borderColor: "#FF5722"
-                        });
-                        
-                        // Send node info to Streamlit via sessionStorage
-                        sessionStorage.setItem('selectedNode', JSON.stringify({
-                            id: nodeId,
-                            label: node.label,
-                            node_id: node.node_id,
-                            type: node.node_type,
-                            level: node.level
-                        }));
-                        
-                        // Trigger a click on a hidden button to refresh Streamlit
-                        document.getElementById('node_selected_trigger').click();
-                    }
-                });
-                
-                // Add double-click event for quick expansion
-                network.on("doubleClick", function(params) {
-                    if (params.nodes.length > 0) {
-                        var nodeId = params.nodes[0];
-                        var node = network.body.data.nodes.get(nodeId);
-                        
-                        // Send node info with expansion flag
-                        sessionStorage.setItem('expandNode', JSON.stringify({
-                            id: nodeId,
-                            label: node.label,
-                            node_id: node.node_id
-                        }));
-                        
-                        // Trigger expand action
-                        document.getElementById('expand_node_trigger').click();
-                    }
-                });
-            } catch (e) {
-                console.error("Error setting up node click handler:", e);
-            }
-        }, 1000);
-        </script>
-        """
-        
-        # Create hidden buttons for node selection and expansion
-        hidden_buttons = """
-        <button id="node_selected_trigger" style="display:none;">Node Selected</button>
-        <button id="expand_node_trigger" style="display:none;">Expand Node</button>
-        <script>
-        // Node selection handler
-        const button = document.getElementById('node_selected_trigger');
-        button.addEventListener('click', function() {
-            const selectedNode = sessionStorage.getItem('selectedNode');
-            if (selectedNode) {
-                const encodedNode = encodeURIComponent(selectedNode);
-                const url = new URL(window.location.href);
-                url.searchParams.set('selected_node', encodedNode);
-                window.location.href = url.toString();
-            }
-        });
-
-        // Node expansion handler
-        const expandButton = document.getElementById('expand_node_trigger');
-        expandButton.addEventListener('click', function() {
-            const expandNode = sessionStorage.getItem('expandNode');
-            if (expandNode) {
-                const encodedNode = encodeURIComponent(expandNode);
-                const url = new URL(window.location.href);
-                url.searchParams.set('expand_node', encodedNode);
-                window.location.href = url.toString();
-            }
-        });
-        </script>
-        """
-        
-        # Insert custom JS and hidden buttons before the closing body tag
-        html_data = html_data.replace('</body>', custom_js + hidden_buttons + '</body>')
-        
-        # Display graph with custom height
-        components.html(html_data, height=600)
+        # Display graph with custom height; clicks come back as the component's value
+        # instead of through a page navigation that would start a new session.
+        # While graph_key is unchanged the component applies node/edge changes to the live
+        # vis.js network instead of reloading the page
+        node_event = _node_picker(
+            html=html_data,
+            nodes=vis_nodes,
+            edges=vis_edges,
+            graph_key=f"{st.session_state.topic}|{st.session_state.live_physics}",
+            height=600,
+            key="node_picker",
+            default=None
+        )
         
-        # Process node selection from URL parameters
-        query_params = st.query_params
-        if "selected_node" in query_params:
-            try:
-                node_data = json.loads(query_params["selected_node"][0])
-                st.session_state.selected_node_id = node_data["id"]
-                st.session_state.current_node = node_data["id"]
+        # A component keeps returning its last value, so act on each event once
+        if node_event and node_event.get("nonce") != st.session_state.get("node_event_nonce"):
+            st.session_state.node_event_nonce = node_event.get("nonce")
+            
+            # Process node selection
+            if node_event.get("action") == "select":
+                st.session_state.selected_node_id = node_event["id"]
+                st.session_state.current_node = node_event["id"]
                 st.session_state.show_node_details = True
-                
-                # Update URL to remove query parameter
-                st.experimental_set_query_params()
-            except Exception as e:
-                st.error(f"Error processing selected node: {e}")
-                
-        # Handle expansion request from double-click
-        if "expand_node" in query_params:
-            try:
-                node_data = json.loads(query_params["expand_node"][0])
-                node_to_expand = node_data["id"]
-                
-                # Only expand if node exists and hasn't been expanded yet
-                if (node_to_expand in st.session_state.graph.nodes() and 
-                    node_to_expand not in st.session_state.subnodes_expanded):
-                    
-                    with st.spinner(f"Expanding {node_to_expand}..."):
-                        # Initialize AI explorer
-                        explorer = AIExplorer(
-                            provider="google" if ai_provider == "Google Generative AI" else "groq"
-                        )
-                        
-                        # Get subnodes for this concept
-                        subnodes_data = explorer.explore_subtopic(
-                            main_topic=st.session_state.topic,
-                            subtopic=node_to_expand
-                        )
-                        
-                        # Update graph with new subnodes
-                        st.session_state.graph = add_subnodes_to_graph(
-                            st.session_state.graph, 
-                            node_to_expand, 
-                            subnodes_data
-                        )
-                        
-                        # Mark node as expanded
-                        st.session_state.subnodes_expanded.add(node_to_expand)
-                        
-                        # Update nodes explored count
-                        st.session_state.nodes_explored.add(node_to_expand)
-                        
-                        # Set current node to the expanded node
-                        st.session_state.current_node = node_to_expand
-                        st.session_state.selected_node_id = node_to_expand
-                        st.session_state.show_node_details = True
-                        
-                        # Save updated graph to database if authenticated
-                        if st.session_state.authenticated:
-                            db = get_db_connection()
-                            
-                            # Convert NetworkX graph to node/edge dict for MongoDB
-                            nodes_dict = {}
-                            edges_dict = {}
-                            
-                            for node in st.session_state.graph.nodes():
-                                nodes_dict[node] = dict(st.session_state.graph.nodes[node])
-                            
-                            for edge in st.session_state.graph.edges():
-                                edge_key = f"{edge[0]}_{edge[1]}"
-                                edges_dict[edge_key] = dict(st.session_state.graph.edges[edge])
-                            
-                            # Update tree in database
-                            tree = db.get_knowledge_tree(st.session_state.user_id, st.session_state.topic)
-                            tree_id = str(tree[0]["_id"]) if tree and len(tree) > 0 else None
-                            
-                            db.save_knowledge_tree(
-                                st.session_state.user_id,
-                                st.session_state.topic,
-                                nodes_dict,
-                                edges_dict,
-                                tree_id=tree_id,
-                                update=True
-                            )
-                
-                # Update URL to remove query parameter
-                st.experimental_set_query_params()
-            except Exception as e:
-                st.error(f"Error processing node expansion: {e}")
-    
-    # Node details section with enhanced UI
-    if st.session_state.graph and st.session_state.current_node:
-        current_node = st.session_state.current_node
-        
-        if current_node in st.session_state.graph.nodes():
-            node_attrs = st.session_state.graph.nodes[current_node]
             
-            # Display node information with enhanced UI
-            with st.expander(f"📖 {current_node}", expanded=True):
-                st.markdown(node_attrs.get('title', 'No description available'))
-                
-                # Node metadata with better layout
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.markdown(f"**Type:** {node_attrs.get('type', 'concept').title()}")
-                with col2:
-                    level = node_attrs.get('level', 0)
-                    st.markdown(f"**Depth Level:** {level}")
-                with col3:
-                    if node_attrs.get('parent'):
-                        parent = node_attrs.get('parent')
-                        st.markdown(f"**Parent:** {parent}")
-                
-                # More visible expansion controls
-                btn_col1, btn_col2 = st.columns(2)
-                with btn_col1:
-                    if current_node not in st.session_state.subnodes_expanded:
-                        expand_btn = st.button("🌱 Expand this concept", 
-                                    key=f"expand_{current_node}",
-                                    type="primary",
-                                    use_container_width=True)
-                    else:
-                        expand_btn = st.button("✓ Already expanded", 
-                                    key=f"expand_{current_node}",
-                                    disabled=True,
-                                    use_container_width=True)
-                        
-                    if expand_btn and current_node not in st.session_state.subnodes_expanded:
-                        with st.spinner(f"Expanding {current_node}..."):
+            # Handle expansion request from double-click
+            elif node_event.get("action") == "expand":
+                try:
+                    node_to_expand = node_event["id"]
+                    
+                    # Only expand if node exists and hasn't been expanded yet
+                    if (node_to_expand in st.session_state.graph.nodes() and 
+                        node_to_expand not in st.session_state.subnodes_expanded):
+                    
+                        with st.spinner(f"Expanding {node_to_expand}..."):
                             # Initialize AI explorer
-                            explorer = AIExplorer(
-                                provider="google" if ai_provider == "Google Generative AI" else "groq"
-                            )
-                            
+                            explorer = get_explorer("google" if ai_provider == "Google Generative AI" else "groq")
+                        
                             # Get subnodes for this concept
                             subnodes_data = explorer.explore_subtopic(
                                 main_topic=st.session_state.topic,
-                                subtopic=current_node
+                                subtopic=node_to_expand
                             )
-                            
-                            # Update graph with new subnodes
+                        
+                            # Update graph with new subnodes, noting where the stored dicts end now
+                            nodes_before, edges_before = len(st.session_state.graph_nodes), len(st.session_state.graph_edges)
                             st.session_state.graph = add_subnodes_to_graph(
                                 st.session_state.graph, 
-                                current_node, 
-                                subnodes_data
+                                node_to_expand, 
+                                subnodes_data,
+                                st.session_state.graph_nodes,
+                                st.session_state.graph_edges
                             )
-                            
+                        
                             # Mark node as expanded
-                            st.session_state.subnodes_expanded.add(current_node)
-                            
+                            st.session_state.subnodes_expanded.add(node_to_expand)
+                        
                             # Update nodes explored count
-                            st.session_state.nodes_explored.add(current_node)
-                            
-                            # Save updated graph to database
-                            if st.session_state.authenticated:
-                                db = get_db_connection()
-                                
-                                # Convert NetworkX graph to node/edge dict for MongoDB
-                                nodes_dict = {}
-                                edges_dict = {}
-                                
-                                for node in st.session_state.graph.nodes():
-                                    nodes_dict[node] = dict(st.session_state.graph.nodes[node])
-                                
-                                for edge in st.session_state.graph.edges():
-                                    edge_key = f"{edge[0]}_{edge[1]}"
-                                    edges_dict[edge_key] = dict(st.session_state.graph.edges[edge])
-                                
-                                # Get existing tree ID or create new
-                                tree = db.get_knowledge_tree(st.session_state.user_id, st.session_state.topic)
-                                tree_id = str(tree[0]["_id"]) if tree and len(tree) > 0 else None
-                                
-                                # Update tree in database
-                                db.save_knowledge_tree(
-                                    st.session_state.user_id,
-                                    st.session_state.topic,
-                                    nodes_dict,
-                                    edges_dict,
-                                    tree_id=tree_id,
-                                    update=True
-                            )
+                            st.session_state.nodes_explored.add(node_to_expand)
                         
-                        st.rerun()
-                
-                # Detailed explanation
-                if st.button("📚 Get detailed explanation", key=f"explain_{current_node}"):
-                    with st.spinner(f"Generating detailed explanation..."):
-                        explorer = AIExplorer(
-                            provider="google" if ai_provider == "Google Generative AI" else "groq"
-                        )
-                        explanation = explorer.get_detailed_explanation(current_node)
-                        st.markdown("### Detailed Explanation")
-                        st.markdown(explanation)
+                            # Set current node to the expanded node
+                            st.session_state.current_node = node_to_expand
+                            st.session_state.selected_node_id = node_to_expand
+                            st.session_state.show_node_details = True
+                        
+                            # Save the additions; a burst of expansions reaches MongoDB as one write
+                            _save_expansion(nodes_before, edges_before, deferred=True)
+                    
+                    # Redraw the graph with the new nodes
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error processing node expansion: {e}")
+    
+    # Node details section with enhanced UI
+    _node_details_fragment(ai_provider)
+    
+    # Auto-expand logic, after the page is drawn; its timer reruns only the fragment per expansion.
+    # Only mounted while auto-expand is on, so idle sessions don't rerun it on the timer
+    if st.session_state.auto_expand:
+        _auto_expand_fragment(ai_provider)
     
     # If user is authenticated, log session when they leave
     if st.session_state.authenticated and st.session_state.graph:
@@ -786,27 +990,21 @@ def show_visualizer():
         if time_spent > 30 and len(st.session_state.nodes_explored) > 0:
             db = get_db_connection()
             
-            # Get tree ID safely
-            tree = db.get_knowledge_tree(st.session_state.user_id, st.session_state.topic)
-            tree_id = str(tree[0]["_id"]) if tree and len(tree) > 0 else None
+            # Get tree ID safely, only asking MongoDB when this session hasn't resolved it yet
+            tree_id = st.session_state.tree_id
+            if not tree_id:
+                tree = db.get_knowledge_tree(st.session_state.user_id, st.session_state.topic, projection={"_id": 1}, limit=1)
+                tree_id = str(tree[0]["_id"]) if tree and len(tree) > 0 else None
             
             if not tree_id:
-                nodes_dict = {}
-                edges_dict = {}
-                
-                for node in st.session_state.graph.nodes():
-                    nodes_dict[node] = dict(st.session_state.graph.nodes[node])
-                
-                for edge in st.session_state.graph.edges():
-                    edge_key = f"{edge[0]}_{edge[1]}"
-                    edges_dict[edge_key] = dict(st.session_state.graph.edges[edge])
-                
                 tree_id = db.save_knowledge_tree(
                     st.session_state.user_id,
                     st.session_state.topic,
-                    nodes_dict,
-                    edges_dict
+                    st.session_state.graph_nodes,
+                    st.session_state.graph_edges
                 )
+                _cached_recent_trees.clear()
+            st.session_state.tree_id = str(tree_id) if tree_id else None
             
             # Log session
             db.log_learning_session(